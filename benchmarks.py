@@ -0,0 +1,757 @@
+"""Benchmarks for the game and app hot paths.
+
+``python benchmarks.py`` prints before/after comparisons against the
+original implementations, then times every case of the regression suite.
+The suite's results can be stored as a JSON baseline and later runs
+checked against it; a check exits with status 1 if any case got slower
+than the baseline by more than the tolerance:
+
+    python benchmarks.py --save benchmarks.json     # record a baseline
+    python benchmarks.py --check benchmarks.json    # fail on regressions
+    python benchmarks.py --check benchmarks.json -k tetris
+
+Every run also executes the correctness checks, which compare optimized
+paths (the batch environments, replays) against the reference engines; a
+failing check exits with status 1 whatever the timings.
+
+Baselines are machine specific, so record and check on the same machine.
+A check also fails if a cold import of a logic module exceeds
+IMPORT_BUDGET, or if importing any game module initializes pygame.
+Drawing benchmarks use SDL's dummy video driver so no window is opened.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from tetris_engine import (TetrisEngine, GRID_WIDTH, GRID_HEIGHT, FULL_ROW, BLACK, RED,
+                           ACTIONS, SHAPE_NAMES, board_hash, column_heights)
+from tetris_pieces import PieceGenerator
+
+
+def _legacy_clear_rows(grid) -> int:
+    """The original shift-down-per-full-row loop, kept as a baseline"""
+    rows_cleared = 0
+    y = GRID_HEIGHT - 1
+    while y >= 0:
+        if all(color != BLACK for color in grid[y]):
+            rows_cleared += 1
+            for move_y in range(y, 0, -1):
+                grid[move_y] = grid[move_y - 1][:]
+            grid[0] = [BLACK] * GRID_WIDTH
+        else:
+            y -= 1
+    return rows_cleared
+
+
+def _pathological_boards():
+    """Yield (name, full-row flags) for boards that stress the row shifting"""
+    yield 'tetris at the bottom', [False] * (GRID_HEIGHT - 4) + [True] * 4
+    yield 'four scattered rows', [y % 5 == 4 for y in range(GRID_HEIGHT)]
+    yield 'single row at the bottom', [False] * (GRID_HEIGHT - 1) + [True]
+    yield 'no full rows', [False] * GRID_HEIGHT
+
+
+def _board_engine(full_rows) -> TetrisEngine:
+    """Build an engine whose board has the given rows full and the rest holed"""
+    engine = TetrisEngine(seed=0)
+    for y, full in enumerate(full_rows):
+        engine.rows[y] = FULL_ROW if full else FULL_ROW & ~1
+        engine.grid[y] = [RED] * GRID_WIDTH
+        if not full:
+            engine.grid[y][0] = BLACK
+    engine.heights = column_heights(engine.rows)
+    return engine
+
+
+def bench_clear_rows(number: int = 20000) -> None:
+    """Compare the single-pass compaction against the legacy loop"""
+    for name, full_rows in _pathological_boards():
+        engine = _board_engine(full_rows)
+        rows = engine.rows[:]
+        grid = [row[:] for row in engine.grid]
+        heights = engine.heights[:]
+
+        def compacting():
+            engine.rows[:] = rows
+            engine.grid[:] = grid
+            engine.heights[:] = heights
+            engine.clear_rows()
+
+        def legacy():
+            _legacy_clear_rows(grid[:])
+
+        new_time = timeit.timeit(compacting, number=number)
+        old_time = timeit.timeit(legacy, number=number)
+        print(f'clear_rows [{name}]: {old_time / number * 1e6:.2f} us -> '
+              f'{new_time / number * 1e6:.2f} us ({old_time / new_time:.1f}x)')
+
+
+def bench_wall_slide(number: int = 20000) -> None:
+    """Move a piece from one wall to the other, one move per column vs one shift"""
+    engine = TetrisEngine(seed=0)
+    engine.current_piece = {'shape': 'I', 'rotation': 1, 'x': GRID_WIDTH // 2 - 2, 'y': 10}
+    engine.shift(-1)
+    start_x = engine.current_piece['x']
+
+    def stepping():
+        engine.current_piece['x'] = start_x
+        while engine.move(1):
+            pass
+
+    def sliding():
+        engine.current_piece['x'] = start_x
+        engine.shift(1)
+
+    old_time = timeit.timeit(stepping, number=number)
+    new_time = timeit.timeit(sliding, number=number)
+    print(f'wall slide: {old_time / number * 1e6:.2f} us -> '
+          f'{new_time / number * 1e6:.2f} us ({old_time / new_time:.1f}x)')
+
+
+def bench_block_drawing(frames: int = 300) -> None:
+    """Frames per second of a full board redraw, per-cell rects vs the sprite atlas"""
+    import pygame
+    from sprite_atlas import BlockAtlas
+    from tetris_engine import SHAPES
+
+    pygame.display.init()
+    block_size = 30
+    screen = pygame.display.set_mode((GRID_WIDTH * block_size, GRID_HEIGHT * block_size))
+    colors = [color for _, color in SHAPES.values()]
+    cells = [(colors[(x + y) % len(colors)], x, y)
+             for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)]
+    atlas = BlockAtlas(block_size - 1, block_size - 1, colors)
+
+    def per_cell_rects():
+        for color, x, y in cells:
+            pygame.draw.rect(screen, color,
+                             (x * block_size, y * block_size, block_size - 1, block_size - 1))
+
+    def atlas_blits():
+        atlas.draw(screen, cells, block_size)
+
+    old_time = timeit.timeit(per_cell_rects, number=frames)
+    new_time = timeit.timeit(atlas_blits, number=frames)
+    print(f'board redraw: {frames / old_time:.0f} fps -> {frames / new_time:.0f} fps '
+          f'({old_time / new_time:.1f}x)')
+    pygame.display.quit()
+
+
+def _racer_arena(cars: int, spatial_hash: bool = True):
+    """A walled square of racer cars driving about at a constant density
+
+    Damping is off so the cars keep moving and colliding without forces,
+    which leaves space.step as the only work to time.
+    """
+    import racer_engine as racer
+
+    side = math.ceil(math.sqrt(cars))
+    spacing = 150
+    size = side * spacing
+    corners = [(0, 0), (size, 0), (size, size), (0, size)]
+    walls = [piece for a, b in zip(corners, corners[1:] + corners[:1])
+             for piece in racer.wall_pieces(a, b)]
+    space = racer.create_space(len(walls) + cars, spatial_hash)
+    space.damping = 1.0
+    racer.add_walls(space, walls)
+    rng = random.Random(0)
+    for i in range(cars):
+        car = racer.Car((i % side + 0.5) * spacing, (i // side + 0.5) * spacing, space,
+                        rng.uniform(0, 2 * math.pi))
+        car.body.velocity = (rng.uniform(-300, 300), rng.uniform(-300, 300))
+        car.body.angular_velocity = rng.uniform(-2, 2)
+    for _ in range(60):  # let the first collisions happen
+        space.step(1 / 60)
+    return space
+
+
+def bench_space_scaling(steps: int = 60) -> None:
+    """Racer physics step time per car as the field grows, spatial hash vs bounding box tree"""
+    try:
+        import pymunk  # noqa: F401
+    except ImportError as error:
+        print(f'racer physics: skipped ({error})')
+        return
+
+    for cars in (25, 100, 400, 1600, 3200):
+        timings = []
+        for spatial_hash in (False, True):
+            space = _racer_arena(cars, spatial_hash)
+            elapsed = min(timeit.repeat(lambda: space.step(1 / 60), number=steps, repeat=3))
+            timings.append(elapsed / steps / cars * 1e6)
+        print(f'racer physics, {cars} cars: {timings[0]:.2f} -> {timings[1]:.2f} us per car')
+
+
+def _racer_cars(count: int):
+    """Screen and (color, center, degrees) for a field of racer cars"""
+    import pygame
+    import moses_jumper_quest as racer
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((racer.WINDOW_WIDTH, racer.WINDOW_HEIGHT))
+    rng = random.Random(0)
+    cars = [(rng.choice((racer.RED, racer.BLUE)),
+             (rng.uniform(0, racer.WINDOW_WIDTH), rng.uniform(0, racer.WINDOW_HEIGHT)),
+             rng.uniform(0, 360)) for _ in range(count)]
+    return screen, cars
+
+
+def bench_car_drawing(cars: int = 100, frames: int = 100) -> None:
+    """Racer car drawing, a new rotated surface per car vs the pre-rotated sprites"""
+    try:
+        import pygame
+        import moses_jumper_quest as racer
+    except ImportError as error:
+        print(f'car drawing: skipped ({error})')
+        return
+
+    screen, field = _racer_cars(cars)
+    sprites = {color: racer.car_sprite(color) for color, _, _ in field}
+
+    def rotating():
+        for color, (x, y), degrees in field:
+            car_surface = pygame.Surface(racer.CAR_SIZE)
+            car_surface.fill(color)
+            rotated_car = pygame.transform.rotate(car_surface, degrees)
+            screen.blit(rotated_car, (x - rotated_car.get_width() // 2,
+                                      y - rotated_car.get_height() // 2))
+
+    def cached():
+        screen.blits([sprites[color].blit_item(degrees, center)
+                      for color, center, degrees in field], doreturn=False)
+
+    old_time = timeit.timeit(rotating, number=frames)
+    new_time = timeit.timeit(cached, number=frames)
+    sprite = next(iter(sprites.values()))
+    print(f'{cars} racer cars: {frames / old_time:.0f} fps -> {frames / new_time:.0f} fps '
+          f'({old_time / new_time:.1f}x), {sprite.nbytes / 2 ** 20:.1f} MiB per skin')
+    pygame.display.quit()
+
+
+# Regression suite: each case is a setup function returning the callable to
+# time, registered with the number of calls per timing run
+CASES: Dict[str, Tuple[Callable[[], Callable[[], None]], int]] = {}
+TOLERANCE = 0.25  # allowed slowdown against the baseline before a check fails
+
+
+def case(name: str, number: int):
+    """Register a benchmark case under a dotted name"""
+    def register(setup: Callable[[], Callable[[], None]]):
+        CASES[name] = (setup, number)
+        return setup
+    return register
+
+
+def _stacked_engine(seed: int) -> TetrisEngine:
+    """An engine whose board holds a random, holed stack of about half height"""
+    from tetris_engine import SHAPES
+
+    rng = random.Random(seed)
+    engine = TetrisEngine(seed=seed)
+    colors = [color for _, color in SHAPES.values()]
+    for y in range(GRID_HEIGHT // 2, GRID_HEIGHT):
+        holes = {rng.randrange(GRID_WIDTH) for _ in range(2)}
+        for x in range(GRID_WIDTH):
+            if x not in holes:
+                engine.rows[y] |= 1 << x
+                engine.grid[y][x] = rng.choice(colors)
+    engine.heights = column_heights(engine.rows)
+    engine.hash = board_hash(engine.rows)
+    return engine
+
+
+@case('tetris.check_collision', 2000)
+def _check_collision_case():
+    engine = _stacked_engine(1)
+    rng = random.Random(2)
+    poses = [{'shape': rng.choice(SHAPE_NAMES), 'rotation': rng.randrange(4),
+              'x': rng.randrange(-1, GRID_WIDTH - 2), 'y': rng.randrange(GRID_HEIGHT - 3)}
+             for _ in range(100)]
+
+    def run():
+        for pose in poses:
+            engine.current_piece = pose
+            engine.check_collision()
+    return run
+
+
+@case('tetris.clear_rows', 2000)
+def _clear_rows_case():
+    engine = _stacked_engine(3)
+    for y in (GRID_HEIGHT - 1, GRID_HEIGHT - 3, GRID_HEIGHT - 4):
+        engine.rows[y] = FULL_ROW
+        engine.grid[y] = [RED] * GRID_WIDTH
+    engine.heights = column_heights(engine.rows)
+    engine.hash = board_hash(engine.rows)
+    state = engine.snapshot()
+
+    def run():
+        engine.rows[:] = state['rows']
+        engine.grid[:] = state['grid']
+        engine.heights[:] = state['heights']
+        engine.clear_rows()
+    return run
+
+
+@case('tetris.freeze_piece', 5000)
+def _freeze_piece_case():
+    engine = _stacked_engine(4)
+    engine.current_piece = {'shape': 'T', 'rotation': 0, 'x': 3, 'y': 0}
+    engine.current_piece['y'] = engine.landing_row()
+    rows, grid, heights = engine.rows[:], [row[:] for row in engine.grid], engine.heights[:]
+
+    def run():
+        engine.rows[:] = rows
+        engine.grid[:] = grid
+        engine.heights[:] = heights
+        engine.freeze_piece()
+    return run
+
+
+@case('tetris.headless_game', 20)
+def _headless_game_case():
+    seeds = itertools.cycle(range(20))  # every timing run plays the same games
+
+    def run():
+        seed = next(seeds)
+        engine = TetrisEngine(seed)
+        rng = random.Random(seed)
+        while not engine.game_over:
+            engine.step(rng.choice(ACTIONS[:5]))
+            engine.tick(1000 / 60)
+    return run
+
+
+@case('tetris.batch_step_4096', 100)
+def _batch_step_case():
+    import numpy as np
+    from tetris_batch import BatchTetris
+
+    batch = BatchTetris(4096, seed=0)
+    rng = np.random.default_rng(0)
+    actions = itertools.cycle(rng.integers(len(ACTIONS), size=(64, 4096)))
+
+    def run():
+        batch.step(next(actions))
+    return run
+
+
+@case('tetris.draw_frame', 200)
+def _draw_frame_case():
+    import tetris_game
+
+    game = tetris_game.Tetris(seed=0)
+    game.engine.restore(_stacked_engine(5).snapshot())
+
+    def run():
+        game.invalidate_display()
+        game.draw()
+    return run
+
+
+def _snake_cycle(width: int, height: int) -> Dict[Tuple[int, int], Tuple[int, int]]:
+    """Direction to take from every cell to follow a Hamiltonian cycle of the grid
+
+    Rows are swept back and forth over columns 1 and up, and column 0 leads
+    back to the start, so a snake shorter than the grid can follow it forever.
+    """
+    directions = {}
+    for y in range(height):
+        for x in range(1, width):
+            forward = (1, 0) if y % 2 == 0 else (-1, 0)
+            at_end = x == width - 1 if y % 2 == 0 else x == 1
+            if not at_end:
+                directions[(x, y)] = forward
+            elif y == height - 1:
+                directions[(x, y)] = (-1, 0)
+            else:
+                directions[(x, y)] = (0, 1)
+        directions[(0, y)] = (0, -1) if y else (1, 0)
+    return directions
+
+
+def _long_snake(length: int):
+    """A snake grown to a length along the board's Hamiltonian cycle, and that cycle"""
+    import snake_engine
+
+    cycle = _snake_cycle(snake_engine.GRID_WIDTH, snake_engine.GRID_HEIGHT)
+    snake = snake_engine.Snake()
+    while len(snake.positions) < length:
+        snake.direction = cycle[snake.get_head_position()]
+        snake.grow()
+        snake.update()
+    return snake, cycle
+
+
+@case('snake.update_long', 2000)
+def _snake_update_case():
+    snake, cycle = _long_snake(1000)
+
+    def run():
+        snake.direction = cycle[snake.get_head_position()]
+        snake.update()
+    return run
+
+
+@case('snake.food_spawn_full', 200)
+def _food_spawn_case():
+    import snake_engine
+
+    snake, _ = _long_snake(snake_engine.GRID_WIDTH * snake_engine.GRID_HEIGHT - 10)
+    food = snake_engine.Food()
+    random.seed(0)
+
+    def run():
+        food.spawn(snake.free)
+    return run
+
+
+def _racer_step_case(cars: int):
+    def setup():
+        space = _racer_arena(cars)
+        return lambda: space.step(1 / 60)
+    return setup
+
+
+for _cars, _number in ((25, 200), (100, 50), (400, 10)):
+    case(f'racer.space_step_{_cars}', _number)(_racer_step_case(_cars))
+
+
+@case('racer.draw_cars_100', 200)
+def _draw_cars_case():
+    import moses_jumper_quest as racer
+
+    screen, field = _racer_cars(100)
+    items = [(racer.car_sprite(color), center, degrees) for color, center, degrees in field]
+
+    def run():
+        screen.blits([sprite.blit_item(degrees, center) for sprite, center, degrees in items],
+                     doreturn=False)
+    return run
+
+
+@case('todo.save_100k', 1)
+def _todo_save_case():
+    from simple_to_list2 import Task, ToDoList
+
+    todo = ToDoList()
+    todo.tasks = [Task(f'Task {i}', f'Description of task {i}', '2025-01-01', 'High')
+                  for i in range(100000)]
+    return todo.save_tasks
+
+
+@case('todo.load_100k', 1)
+def _todo_load_case():
+    from simple_to_list2 import ToDoList
+
+    _todo_save_case()()  # leaves a 100k task file in the scratch directory
+    return ToDoList
+
+
+@case('employee.aggregate_1m', 5)
+def _employee_case():
+    import numpy as np
+    import pandas as pd
+    from employee import department_counts, performance_distribution
+
+    rng = np.random.default_rng(0)
+    rows = 1000000
+    employees = pd.DataFrame({
+        'Name': [f'Employee {i}' for i in range(rows)],
+        'Age': rng.integers(20, 65, rows),
+        'Department': rng.choice(['Sales', 'Engineering', 'Support', 'HR', 'Finance'], rows),
+        'Salary': rng.uniform(30000, 150000, rows),
+        'Performance Score': rng.uniform(0, 100, rows),
+    })
+
+    def run():
+        department_counts(employees)
+        performance_distribution(employees)
+    return run
+
+
+# Modules holding game logic, which must import quickly and without a display
+LOGIC_MODULES = ('tetris_pieces', 'tetris_engine', 'tetris_input', 'tetris_replay',
+                 'tetris_ai', 'snake_engine', 'racer_engine')
+# Front ends, which import pygame but must not initialize it or open a window
+GAME_MODULES = ('tetris_game', 'Snake_game', 'moses_jumper_quest', 'launcher')
+IMPORT_BUDGET = 0.010  # seconds allowed for a cold import of a logic module
+# typing alone takes about 9 ms to import, so the logic modules postpone their
+# annotations (from __future__ import annotations) and import typing only
+# under a TYPE_CHECKING flag that is False at runtime but that type checkers
+# treat as true. That keeps annotations like List[int] checked without the
+# import cost. Aliases built from typing, like Cells, live in that block too.
+
+# Run in a fresh interpreter with nothing but sys and time (both built into
+# the interpreter) imported before the timer, so every module the import pulls
+# in is counted
+_IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+pygame = sys.modules.get('pygame')
+print(elapsed, bool(pygame and (pygame.get_init() or pygame.display.get_init())))
+"""
+
+
+def import_time(module: str, repeat: int = 5) -> float:
+    """Best seconds for a cold import of a module, in fresh interpreters with no display
+
+    A first, untimed import writes the bytecode of everything the module
+    imports, so the timed runs measure loading rather than compiling.
+    Raises RuntimeError if the import starts pygame.
+    """
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('SDL_VIDEODRIVER', 'DISPLAY', 'WAYLAND_DISPLAY',
+                          'PYTHONDONTWRITEBYTECODE')}
+    env['PYTHONPATH'] = os.path.dirname(os.path.abspath(__file__))
+    env['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    times = []
+    for _ in range(repeat + 1):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_SCRIPT.format(module=module)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+        elapsed, started = output.split()
+        if started == 'True':
+            raise RuntimeError(f'importing {module} initializes pygame')
+        times.append(float(elapsed))
+    return min(times[1:])
+
+
+def over_budget(results: Dict[str, float]) -> List[str]:
+    """Describe every logic module whose import took longer than IMPORT_BUDGET"""
+    return [f'import.{module}: {results[f"import.{module}"] * 1e3:.2f} ms '
+            f'(budget {IMPORT_BUDGET * 1e3:.0f} ms)'
+            for module in LOGIC_MODULES
+            if results.get(f'import.{module}', 0) > IMPORT_BUDGET]
+
+
+def run_suite(pattern: Optional[str] = None, repeat: int = 5) -> Dict[str, float]:
+    """Best seconds per call of every case whose name matches pattern
+
+    Cases run in a scratch directory, so files they write are cleaned up.
+    Cases whose optional dependencies are missing are reported and skipped.
+    """
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        try:
+            for name, (setup, number) in CASES.items():
+                if pattern and not re.search(pattern, name):
+                    continue
+                try:
+                    func = setup()
+                except ImportError as error:
+                    print(f'{name}: skipped ({error})')
+                    continue
+                best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+                results[name] = best
+                print(f'{name}: {best * 1e3:.4f} ms ({1 / best:.1f}/s)')
+        finally:
+            os.chdir(cwd)
+
+    for module in LOGIC_MODULES + GAME_MODULES:
+        name = f'import.{module}'
+        if pattern and not re.search(pattern, name):
+            continue
+        try:
+            results[name] = import_time(module, repeat)
+        except subprocess.CalledProcessError as error:
+            print(f'{name}: skipped ({error.stderr.strip().splitlines()[-1]})')
+            continue
+        print(f'{name}: {results[name] * 1e3:.2f} ms')
+    return results
+
+
+# Correctness checks: functions that raise AssertionError if an optimized
+# path stops matching the reference implementation it replaces
+CHECKS: Dict[str, Callable[[], None]] = {}
+
+
+def check(name: str):
+    """Register a correctness check under a dotted name"""
+    def register(func: Callable[[], None]):
+        CHECKS[name] = func
+        return func
+    return register
+
+
+class _ScriptedPieces(PieceGenerator):
+    """Deals a fixed piece sequence, then nothing but I pieces"""
+    name = 'scripted'
+
+    def __init__(self, shapes: List[str]):
+        self.script = list(shapes)
+        super().__init__(SHAPE_NAMES)
+
+    def generate_block(self) -> List[str]:
+        block, self.script = self.script, ['I'] * 64
+        return block
+
+
+@check('tetris.batch_parity')
+def _tetris_batch_parity(boards: int = 256, steps: int = 1000) -> None:
+    """Random play on BatchTetris matches TetrisEngine dealt the same pieces"""
+    import numpy as np
+    from tetris_batch import BatchTetris
+
+    batch = BatchTetris(boards, seed=1, auto_reset=False)
+    shapes = [[SHAPE_NAMES[batch.shape[i]], SHAPE_NAMES[batch.next_shape[i]]]
+              for i in range(boards)]
+    rng = np.random.default_rng(2)
+    actions = rng.integers(len(ACTIONS), size=(steps, boards))
+    for step_actions in actions:
+        pieces = batch.pieces.copy()
+        batch.step(step_actions)
+        for i in np.nonzero(batch.pieces != pieces)[0]:
+            shapes[i].append(SHAPE_NAMES[batch.next_shape[i]])
+
+    for i in range(boards):
+        engine = TetrisEngine(0, _ScriptedPieces(shapes[i]))
+        for step_actions in actions:
+            engine.step(int(step_actions[i]))
+        assert [int(row) for row in batch.boards[i, :GRID_HEIGHT]] == engine.rows, \
+            f'board {i} differs'
+        assert (engine.score, engine.pieces, engine.game_over) == \
+            (batch.score[i], batch.pieces[i], batch.game_over[i]), f'board {i} state differs'
+
+
+@check('snake.batch_parity')
+def _snake_batch_parity(boards: int = 64, steps: int = 3000) -> None:
+    """Random play on BatchSnake matches SnakeEngine given the same food cells"""
+    import numpy as np
+    from snake_batch import BatchSnake, CELLS
+    from snake_engine import SnakeEngine, DIRECTIONS, GRID_WIDTH as SNAKE_WIDTH
+
+    def cell(index):
+        return None if index < 0 else (int(index) % SNAKE_WIDTH, int(index) // SNAKE_WIDTH)
+
+    batch = BatchSnake(boards, seed=3, auto_reset=False)
+    engines = [SnakeEngine(0) for _ in range(boards)]
+    for i, engine in enumerate(engines):
+        engine.food.position = cell(batch.food[i])
+    rng = np.random.default_rng(1)
+    for _ in range(steps):
+        actions = rng.choice([-1, -1, -1, -1, 0, 1, 2, 3], size=boards)
+        ate, _ = batch.step(actions)
+        for i, engine in enumerate(engines):
+            eaten = engine.step(None if actions[i] < 0 else DIRECTIONS[actions[i]])
+            if eaten:
+                engine.food.position = cell(batch.food[i])
+            body = [cell(batch.body[i, (batch.head_slot[i] - k) % CELLS])
+                    for k in range(batch.length[i])]
+            assert list(engine.snake.positions) == body, f'snake {i} body differs'
+            assert (eaten, engine.score, engine.game_over, engine.won) == \
+                (ate[i], batch.score[i], batch.game_over[i], batch.won[i]), \
+                f'snake {i} state differs'
+
+
+@check('tetris.replay_roundtrip')
+def _replay_roundtrip(ticks: int = 20000) -> None:
+    """A recorded game survives encoding and replays, and seeks, to the same state"""
+    from tetris_replay import Recording, ReplayPlayer
+
+    rng = random.Random(4)
+    engine = TetrisEngine(5, '7bag')
+    recording = Recording(5, '7bag')
+    while engine.ticks < ticks and not engine.game_over:
+        if rng.random() < 0.2:
+            action = rng.choice(ACTIONS[1:])
+            recording.add(engine.ticks, action)
+            engine.step(action)
+        engine.tick(recording.tick_ms)
+    recording.ticks = engine.ticks
+
+    decoded = Recording.from_bytes(recording.to_bytes())
+    assert decoded.events == recording.events, 'events changed in encoding'
+    player = ReplayPlayer(decoded)
+    assert player.play().snapshot() == engine.snapshot(), 'replay ended in a different state'
+    middle = engine.ticks // 2
+    sought = player.seek(middle).snapshot()
+    assert sought == ReplayPlayer(decoded).play(middle).snapshot(), 'seek differs from playing'
+
+
+def run_checks(pattern: Optional[str] = None) -> List[str]:
+    """Run every check whose name matches pattern and describe the failures"""
+    failures = []
+    for name, func in CHECKS.items():
+        if pattern and not re.search(pattern, name):
+            continue
+        try:
+            func()
+        except ImportError as error:
+            print(f'{name}: skipped ({error})')
+            continue
+        except AssertionError as error:
+            failures.append(f'{name}: {error}')
+            print(f'{name}: FAILED ({error})')
+            continue
+        print(f'{name}: ok')
+    return failures
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            tolerance: float = TOLERANCE) -> List[str]:
+    """Describe every case more than tolerance slower than its baseline"""
+    regressions = []
+    for name, seconds in results.items():
+        if name not in baseline:
+            print(f'{name}: not in the baseline')
+            continue
+        ratio = seconds / baseline[name]
+        if ratio > 1 + tolerance:
+            regressions.append(f'{name}: {baseline[name] * 1e3:.4f} ms -> '
+                               f'{seconds * 1e3:.4f} ms ({ratio:.2f}x slower)')
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the benchmarks")
+    parser.add_argument('--save', metavar='PATH', help="write the suite results as a baseline")
+    parser.add_argument('--check', metavar='PATH', help="fail if slower than this baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help="allowed slowdown, as a fraction of the baseline")
+    parser.add_argument('-k', dest='pattern', help="only run cases matching this regex")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if not (args.save or args.check or args.pattern):
+        bench_clear_rows()
+        bench_wall_slide()
+        bench_block_drawing()
+        bench_space_scaling()
+        bench_car_drawing()
+    failures = run_checks(args.pattern)
+    results = run_suite(args.pattern, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if args.check:
+        with open(args.check) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        regressions += over_budget(results)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions or failures:
+            sys.exit(1)
+        print(f'No regressions beyond {args.tolerance:.0%} against {args.check}')
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@ Created on Tue Dec 10 19:21:52 2024
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
 
 # Step 1: Collect employee details
 def collect_employee_data():
@@ -31,12 +30,24 @@ def collect_employee_data():
     
     return pd.DataFrame(employees)
 
+# Aggregations behind the charts, kept free of plotting so they can be
+# reused and benchmarked on large frames
+def department_counts(employee_df):
+    return employee_df['Department'].value_counts()
+
+def performance_distribution(employee_df):
+    performance_bins = pd.cut(employee_df['Performance Score'], bins=[0, 50, 70, 85, 100], 
+                              labels=['Poor', 'Average', 'Good', 'Excellent'])
+    return performance_bins.value_counts()
+
 # Step 2: Generate visualizations
 def generate_visualizations(employee_df):
+    # Imported here so the data helpers work without a plotting backend
+    import matplotlib.pyplot as plt
+
     # Bar chart for department distribution
     plt.figure(figsize=(10, 5))
-    department_counts = employee_df['Department'].value_counts()
-    department_counts.plot(kind='bar', color='skyblue')
+    department_counts(employee_df).plot(kind='bar', color='skyblue')
     plt.title('Employee Count by Department')
     plt.xlabel('Department')
     plt.ylabel('Count')
@@ -44,9 +55,7 @@ def generate_visualizations(employee_df):
     
     # Pie chart for performance distribution
     plt.figure(figsize=(8, 8))
-    performance_bins = pd.cut(employee_df['Performance Score'], bins=[0, 50, 70, 85, 100], 
-                               labels=['Poor', 'Average', 'Good', 'Excellent'])
-    performance_bins.value_counts().plot(kind='pie', autopct='%1.1f%%', colors=['red', 'orange', 'yellow', 'green'])
+    performance_distribution(employee_df).plot(kind='pie', autopct='%1.1f%%', colors=['red', 'orange', 'yellow', 'green'])
     plt.title('Performance Distribution')
     plt.ylabel('')
     plt.show()
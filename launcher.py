@@ -0,0 +1,279 @@
+"""One entry point for all the arcade games.
+
+The launcher opens a menu listing the games straight away. A background
+thread imports the game modules while the menu is shown, and between menu
+frames each imported game's preload() loads its fonts and sprites, so
+a chosen game starts without paying for any of that.
+
+A game runs in the launcher's own process by default and returns to the
+menu when the player quits. With isolation on, it runs in a separate worker
+process instead, so a crash or leak cannot take the menu down. Starting a
+fresh interpreter would throw the warm-up away, so the launcher keeps one
+worker that has already imported and preloaded every game, hands it the
+chosen game, and starts the next spare when the game returns to the menu.
+
+    python launcher.py                  # menu, games run in-process
+    python launcher.py --isolated       # menu, games run in worker processes
+    python launcher.py tetris           # start one game directly
+    TETRIS_RECORD=0 python launcher.py  # don't record Tetris sessions to replays/
+"""
+import argparse
+import importlib
+import multiprocessing
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import pygame
+
+from pygame_setup import init_pygame
+from text_cache import render_text
+
+# Window
+SCREEN_WIDTH = 640
+SCREEN_HEIGHT = 480
+FPS = 30
+TITLE_SIZE = 64
+ITEM_SIZE = 40
+HINT_SIZE = 24
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GRAY = (128, 128, 128)
+YELLOW = (255, 255, 0)
+
+
+class GameEntry(NamedTuple):
+    key: str       # short name for the command line
+    title: str     # name shown in the menu
+    module: str    # module with preload() and play()
+
+
+GAMES = [
+    GameEntry('tetris', 'Tetris', 'tetris_game'),
+    GameEntry('snake', 'Snake', 'Snake_game'),
+    GameEntry('racer', 'Speed Demons Racing', 'moses_jumper_quest'),
+]
+
+
+class Preloader:
+    """Imports the game modules on a background thread and warms their assets
+
+    Only the imports run on the thread. Fonts and sprites are created on the
+    main thread, one game per warm() call, since pygame objects are not
+    thread safe.
+    """
+
+    def __init__(self, modules: List[str]):
+        self.modules = modules
+        self.imported: Dict[str, object] = {}
+        self.errors: Dict[str, Exception] = {}
+        self.ready = {name: threading.Event() for name in modules}
+        self.warmed = set()
+        self.thread = threading.Thread(target=self.import_all, daemon=True)
+        self.thread.start()
+
+    def import_all(self) -> None:
+        for name in self.modules:
+            try:
+                self.imported[name] = importlib.import_module(name)
+            except Exception as error:  # e.g. pymunk missing; reported when chosen
+                self.errors[name] = error
+            self.ready[name].set()
+
+    def warm(self) -> bool:
+        """Preload the assets of one imported game, returning False if none was due"""
+        for name in self.modules:
+            if name in self.imported and name not in self.warmed:
+                self.warmed.add(name)
+                self.imported[name].preload()
+                return True
+        return False
+
+    def status(self, name: str) -> str:
+        if name in self.errors:
+            return 'unavailable'
+        return 'ready' if name in self.warmed else 'loading'
+
+    def get(self, name: str):
+        """The game module, imported and warmed, waiting for the thread if needed
+
+        Raises the import's exception if the module could not be imported.
+        """
+        self.ready[name].wait()
+        if name in self.errors:
+            raise self.errors[name]
+        if name not in self.warmed:
+            self.warmed.add(name)
+            self.imported[name].preload()
+        return self.imported[name]
+
+
+def _worker_main(conn, modules: List[str]) -> None:
+    """Body of a worker process: warm up every game, then play the one asked for"""
+    pygame.font.init()
+    for name in modules:
+        try:
+            importlib.import_module(name).preload()
+        except Exception:
+            pass  # the launcher reports the failed import itself
+    name = conn.recv()
+    if name is None:
+        return
+    importlib.import_module(name).play()
+    pygame.quit()
+
+
+class Worker:
+    """A spare process that has already imported and preloaded every game
+
+    Workers are started with the spawn method: forking a process that has an
+    SDL window open is unsafe.
+    """
+
+    def __init__(self, modules: List[str]):
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, modules),
+                                       daemon=True)
+        self.process.start()
+
+    def play(self, name: str) -> int:
+        """Run a game in the worker and return its exit code once it finishes"""
+        self.conn.send(name)
+        self.process.join()
+        return self.process.exitcode
+
+    def close(self) -> None:
+        """Stop an unused worker"""
+        if self.process.is_alive():
+            self.conn.send(None)
+            self.process.join(1)
+            if self.process.is_alive():
+                self.process.terminate()
+
+
+class Launcher:
+    def __init__(self, isolated: bool = False, games: List[GameEntry] = GAMES):
+        self.games = games
+        self.isolated = isolated
+        self.selected = 0
+        self.message = ''
+        modules = [game.module for game in games]
+        self.preloader = Preloader(modules)
+        self.worker = Worker(modules) if isolated else None
+        init_pygame()
+        self.open_window()
+        self.clock = pygame.time.Clock()
+
+    def open_window(self) -> None:
+        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption('Arcade')
+
+    def toggle_isolation(self) -> None:
+        self.isolated = not self.isolated
+        if self.isolated:
+            self.worker = Worker(self.preloader.modules)
+        else:
+            self.worker.close()
+            self.worker = None
+
+    def launch(self, game: GameEntry) -> None:
+        """Play a game, then come back to the menu"""
+        try:
+            module = self.preloader.get(game.module)
+        except Exception as error:  # whatever import_all stored for the module
+            self.message = f'{game.title} is unavailable: {error}'
+            return
+
+        if self.isolated:
+            # Give the display to the worker while the game runs, then warm a
+            # spare for the next game while the menu is back on screen
+            if not self.worker.process.is_alive():
+                self.worker = Worker(self.preloader.modules)  # the spare died warming up
+            pygame.display.quit()
+            code = self.worker.play(game.module)
+            pygame.display.init()
+            self.worker = Worker(self.preloader.modules)
+            self.message = f'{game.title} exited with code {code}' if code else ''
+        else:
+            module.play()
+            self.message = ''
+        self.open_window()
+
+    def handle_events(self) -> bool:
+        """Process menu input, returning False when the launcher should exit"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key in (pygame.K_ESCAPE, pygame.K_q):
+                return False
+            if event.key == pygame.K_UP:
+                self.selected = (self.selected - 1) % len(self.games)
+            elif event.key == pygame.K_DOWN:
+                self.selected = (self.selected + 1) % len(self.games)
+            elif event.key == pygame.K_i:
+                self.toggle_isolation()
+            elif event.key in (pygame.K_RETURN, pygame.K_SPACE):
+                self.launch(self.games[self.selected])
+            elif pygame.K_1 <= event.key < pygame.K_1 + len(self.games):
+                self.launch(self.games[event.key - pygame.K_1])
+        return True
+
+    def draw(self) -> None:
+        self.screen.fill(BLACK)
+        title = render_text('Arcade', TITLE_SIZE, WHITE)
+        self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 40))
+
+        for index, game in enumerate(self.games):
+            color = YELLOW if index == self.selected else WHITE
+            item = render_text(f'{index + 1}. {game.title}', ITEM_SIZE, color)
+            status = render_text(self.preloader.status(game.module), HINT_SIZE, GRAY)
+            y = 150 + index * 60
+            self.screen.blit(item, (80, y))
+            self.screen.blit(status, (SCREEN_WIDTH - 80 - status.get_width(), y + 8))
+
+        mode = 'separate process' if self.isolated else 'this process'
+        hints = [f'Enter: play in {mode}   I: switch', 'Esc: quit']
+        if self.message:
+            hints.insert(0, self.message)
+        for index, hint in enumerate(reversed(hints)):
+            text = render_text(hint, HINT_SIZE, GRAY)
+            self.screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2,
+                                    SCREEN_HEIGHT - 40 - index * 28))
+
+    def run(self) -> None:
+        while self.handle_events():
+            # Warm one game per frame so the menu stays responsive
+            self.preloader.warm()
+            self.draw()
+            pygame.display.flip()
+            self.clock.tick(FPS)
+        self.close()
+
+    def close(self) -> None:
+        if self.worker is not None:
+            self.worker.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('game', nargs='?', choices=[game.key for game in GAMES],
+                        help='start this game directly instead of showing the menu')
+    parser.add_argument('--isolated', action='store_true',
+                        help='run games in a separate process')
+    args = parser.parse_args(argv)
+
+    launcher = Launcher(args.isolated)
+    if args.game:
+        launcher.launch(next(game for game in GAMES if game.key == args.game))
+        launcher.close()
+    else:
+        launcher.run()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
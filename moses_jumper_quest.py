@@ -3,33 +3,29 @@ import sys
 import sys
 sys.path.append("path_to_conda_env_lib_site-packages")
 import math
-import pymunk
+import random
 from enum import Enum
-
-# Initialize Pygame and Pymunk
-pygame.init()
-pygame.mixer.init()
-space = pymunk.Space()
-space.gravity = (0.0, 0.0)  # No gravity for top-down racing
-space.damping = 0.7  # Add some air resistance
+from profiler import profiler_from_env
+from pygame_setup import init_pygame
+from text_cache import get_font
+from sprite_atlas import RotationCache
+from racer_engine import (CAR_SIZE, WALL_THICKNESS, PLAYER_ACCELERATION, AI_CARS,
+                          AI_ACCELERATION, RED, BLUE, Track, Car, AIDriver,
+                          create_space, add_walls)
 
 # Constants
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 FPS = 60
+FONT_SIZES = (74, 48, 36)  # title, menu entries, credits
 
-# Physics constants
-PLAYER_MASS = 1
-PLAYER_MOMENT = 1000
-PLAYER_ACCELERATION = 1200
-PLAYER_TURN_SPEED = 4.0
-FRICTION = 0.7
+# Car sprites
+CAR_ANGLE_STEPS = 360              # pre-rendered car angles, one per degree
+CAR_SPRITE_BUDGET = 32 * 2 ** 20   # bytes of rotated car sprites kept, four skins at 7.8 MiB
 
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-BLUE = (0, 0, 255)
 
 # Game states
 class GameState(Enum):
@@ -40,51 +36,74 @@ class GameState(Enum):
     PAUSED = 5
     GAME_OVER = 6
 
-class Car:
-    def __init__(self, x, y):
-        self.body = pymunk.Body(PLAYER_MASS, PLAYER_MOMENT)
-        self.body.position = x, y
-        
-        # Create a box shape for the car
-        size = (40, 80)
-        self.shape = pymunk.Poly.create_box(self.body, size)
-        self.shape.elasticity = 0.5
-        self.shape.friction = FRICTION
-        
-        space.add(self.body, self.shape)
-        
-        # Car properties
-        self.acceleration = 0
-        self.steering = 0
-        self.speed = 0
-        
-    def update(self):
-        # Apply forces based on input
-        force_x = math.cos(self.body.angle) * self.acceleration
-        force_y = math.sin(self.body.angle) * self.acceleration
-        self.body.apply_force_at_local_point((force_x, force_y), (0, 0))
-        
-        # Apply steering
-        self.body.angular_velocity = self.steering * PLAYER_TURN_SPEED
-        
-        # Update speed
-        self.speed = math.sqrt(self.body.velocity.x**2 + self.body.velocity.y**2)
+# Rotated car sprites by color, shared by every race
+car_sprites = RotationCache(CAR_SPRITE_BUDGET, CAR_ANGLE_STEPS)
+
+def car_image(color):
+    """Unrotated car image; the transparent background keeps rotated corners clear"""
+    image = pygame.Surface(CAR_SIZE, pygame.SRCALPHA)
+    image.fill(color)
+    return image
+
+def car_sprite(color):
+    """The car in a color, pre-rendered at every angle"""
+    return car_sprites.get(color, lambda: car_image(color))
+
+def preload():
+    """Load the fonts, car sprites and physics library before the window opens"""
+    import pymunk  # racer_engine imports it on first use; do it before the race
+    pygame.font.init()
+    for size in FONT_SIZES:
+        get_font(size)
+    for color in (RED, BLUE):
+        car_sprite(color)
+
+def play(profiler=None):
+    """Show the racer's main menu and run races until the player quits"""
+    Game(profiler).run()
 
 class Game:
-    def __init__(self):
+    def __init__(self, profiler=None, ai_cars=AI_CARS):
+        init_pygame(mixer=True)
+        self.profiler = profiler if profiler is not None else profiler_from_env()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Speed Demons Racing")
         self.clock = pygame.time.Clock()
         self.game_state = GameState.MENU
-        self.font_large = pygame.font.Font(None, 74)
-        self.font_medium = pygame.font.Font(None, 48)
-        self.font_small = pygame.font.Font(None, 36)
+        self.font_large, self.font_medium, self.font_small = map(get_font, FONT_SIZES)
+        self.running = True
         
-        # Initialize player car
+        # The track is the same for every race, and its starting grid limits
+        # the field: any AI cars beyond the room left by the player stay home
+        self.track = Track()
+        self.ai_cars = max(0, min(ai_cars, len(self.track.slots) - 1))
+
+        # Physics world and cars, created for each race
+        self.space = None
+        self.background = None
         self.player = None
+        self.cars = []
+        self.sprites = []
+        self.drivers = []
 
     def start_game(self):
-        self.player = Car(WINDOW_WIDTH//2, WINDOW_HEIGHT//2)
+        slots = self.track.grid(self.ai_cars + 1)
+        self.space = create_space(len(self.track.walls) + len(slots))
+        add_walls(self.space, self.track.walls)
+
+        # The player starts at the back of the grid
+        *ai_slots, (x, y, angle) = slots
+        self.player = Car(x, y, self.space, angle)
+        self.cars = [Car(x, y, self.space, angle, BLUE) for x, y, angle in ai_slots]
+        self.drivers = [AIDriver(car, self.track, AI_ACCELERATION * random.uniform(0.85, 1.0))
+                        for car in self.cars]
+        self.cars.append(self.player)
+        self.sprites = [car_sprite(car.color) for car in self.cars]
+
+        self.background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        self.background.fill(BLACK)
+        for outline in self.track.outlines:
+            pygame.draw.polygon(self.background, WHITE, outline, WALL_THICKNESS)
         self.game_state = GameState.PLAYING
 
     def handle_playing_input(self):
@@ -107,44 +126,53 @@ class Game:
             self.player.steering = 1
 
     def run(self):
-        while True:
+        while self.running:
             if self.game_state == GameState.MENU:
                 self.main_menu()
             elif self.game_state == GameState.PLAYING:
                 self.game_loop()
 
     def game_loop(self):
+        profiler = self.profiler
         while self.game_state == GameState.PLAYING:
-            # Handle events
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.game_state = GameState.MENU
-            
-            # Handle input
-            self.handle_playing_input()
-            
+            profiler.begin_frame()
+            with profiler.phase('input'):
+                # Handle events
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                        return
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            self.game_state = GameState.MENU
+
+                # Handle input
+                self.handle_playing_input()
+
             # Update physics
-            self.player.update()
-            space.step(1/FPS)
-            
-            # Draw
-            self.screen.fill(BLACK)
-            
-            # Draw car (simple rectangle for now)
-            car_pos = self.player.body.position
-            car_angle = math.degrees(self.player.body.angle)
-            car_surface = pygame.Surface((40, 80))
-            car_surface.fill(RED)
-            rotated_car = pygame.transform.rotate(car_surface, -car_angle)
-            self.screen.blit(rotated_car, (car_pos.x - rotated_car.get_width()//2,
-                                         car_pos.y - rotated_car.get_height()//2))
-            
-            pygame.display.flip()
+            with profiler.phase('update'):
+                for driver in self.drivers:
+                    driver.update()
+                for car in self.cars:
+                    car.update()
+            with profiler.phase('physics'):
+                self.space.step(1/FPS)
+
+            with profiler.phase('draw'):
+                # Draw
+                self.screen.blit(self.background, (0, 0))
+
+                # Draw cars from their pre-rotated sprites in one batch
+                self.screen.blits([sprite.blit_item(-math.degrees(car.body.angle),
+                                                    car.body.position)
+                                   for car, sprite in zip(self.cars, self.sprites)],
+                                  doreturn=False)
+                profiler.draw_overlay(self.screen)
+
+            with profiler.phase('flip'):
+                pygame.display.flip()
             self.clock.tick(FPS)
+            profiler.end_frame()
 
     def main_menu(self):
         title = self.font_large.render("Speed Demons Racing", True, WHITE)
@@ -156,8 +184,8 @@ class Game:
         while self.game_state == GameState.MENU:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.running = False
+                    return
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     mouse_pos = pygame.mouse.get_pos()
                     # Start button
@@ -167,8 +195,8 @@ class Game:
                     # Exit button
                     elif WINDOW_WIDTH//2 - 100 <= mouse_pos[0] <= WINDOW_WIDTH//2 + 100 and \
                          490 <= mouse_pos[1] <= 550:
-                        pygame.quit()
-                        sys.exit()
+                        self.running = False
+                        return
 
             # Draw menu
             self.screen.fill(BLACK)
@@ -182,5 +210,5 @@ class Game:
             self.clock.tick(FPS)
 
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    play()
+    pygame.quit()
\ No newline at end of file
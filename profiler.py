@@ -0,0 +1,201 @@
+"""Opt-in per-frame phase timing for the pygame games.
+
+A FrameProfiler times the phases of every frame (input, update, physics,
+draw and flip) and keeps the last few hundred frames in a ring buffer, from
+which it reports rolling p50/p95/p99 timings. The numbers can be drawn as
+an on-screen overlay and dumped to CSV or JSON.
+
+Profiling is off unless the GAME_PROFILE environment variable is set:
+
+    GAME_PROFILE=1 python tetris_game.py              # overlay only
+    GAME_PROFILE=frames.csv python Snake_game.py      # overlay, dump on exit
+    GAME_PROFILE=frames.json python moses_jumper_quest.py
+"""
+import atexit
+import csv
+import json
+import os
+import time
+from array import array
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterator, List, Tuple, Union
+
+import pygame
+
+from text_cache import get_font
+
+PHASES = ('input', 'update', 'physics', 'draw', 'flip')
+PERCENTILES = (50, 95, 99)
+HISTORY = 600            # frames kept for the rolling percentiles
+OVERLAY_INTERVAL = 30    # frames between overlay text refreshes
+OVERLAY_FONT_SIZE = 18
+ENV_VAR = 'GAME_PROFILE'
+
+Color = Tuple[int, int, int]
+
+
+def percentile(ordered: List[float], point: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * point // 100))  # ceiling division
+    return ordered[int(rank) - 1]
+
+
+class FrameProfiler:
+    enabled = True
+
+    def __init__(self, history: int = HISTORY):
+        self.history = history
+        self.columns = PHASES + ('frame',)
+        self.samples = {name: array('d', bytes(8 * history)) for name in self.columns}
+        self.frames = 0
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.frame_start = None
+        self.overlay_surface = None
+        self.overlay_rect = None
+
+    def begin_frame(self) -> None:
+        """Start timing a new frame"""
+        for name in PHASES:
+            self.current[name] = 0.0
+        self.frame_start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the time spent in the with-block to a phase of the current frame"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] += time.perf_counter() - start
+
+    def end_frame(self) -> None:
+        """Store the finished frame's timings, in milliseconds, in the ring buffer"""
+        if self.frame_start is None:
+            return
+        slot = self.frames % self.history
+        for name in PHASES:
+            self.samples[name][slot] = self.current[name] * 1000
+        self.samples['frame'][slot] = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_start = None
+        self.frames += 1
+
+    def recent(self, name: str) -> List[float]:
+        """Timings of a phase for the frames in the buffer, oldest first"""
+        samples = self.samples[name]
+        if self.frames <= self.history:
+            return list(samples[:self.frames])
+        slot = self.frames % self.history
+        return list(samples[slot:]) + list(samples[:slot])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Mean, max and percentiles of every phase over the buffered frames"""
+        summary = {}
+        for name in self.columns:
+            values = sorted(self.recent(name))
+            stats = {f'p{point}': percentile(values, point) for point in PERCENTILES}
+            stats['mean'] = sum(values) / len(values) if values else 0.0
+            stats['max'] = values[-1] if values else 0.0
+            summary[name] = stats
+        return summary
+
+    def overlay_lines(self) -> List[str]:
+        """Text of the overlay: one p50/p95/p99 line per phase"""
+        lines = ['ms   ' + '/'.join(f'p{point}' for point in PERCENTILES)]
+        for name, stats in self.summary().items():
+            lines.append(f'{name:<8}' + '/'.join(f'{stats[f"p{point}"]:.1f}'
+                                                 for point in PERCENTILES))
+        return lines
+
+    def draw_overlay(self, surface: pygame.Surface, topleft: Tuple[int, int] = (5, 5),
+                     color: Color = (255, 255, 0),
+                     background: Color = (0, 0, 0)) -> List[pygame.Rect]:
+        """Draw the overlay and return the screen areas it touched
+
+        The text is re-rendered every OVERLAY_INTERVAL frames; in between the
+        previous image is blitted again.
+        """
+        if self.overlay_surface is None or self.frames % OVERLAY_INTERVAL == 0:
+            # Rendered directly rather than through the shared text cache,
+            # since the numbers change on every refresh
+            font = get_font(OVERLAY_FONT_SIZE)
+            lines = [font.render(line, True, color, background) for line in self.overlay_lines()]
+            width = max(line.get_width() for line in lines)
+            height = sum(line.get_height() for line in lines)
+            self.overlay_surface = pygame.Surface((width, height))
+            self.overlay_surface.fill(background)
+            y = 0
+            for line in lines:
+                self.overlay_surface.blit(line, (0, y))
+                y += line.get_height()
+
+        dirty = []
+        if self.overlay_rect is not None:
+            surface.fill(background, self.overlay_rect)
+            dirty.append(self.overlay_rect)
+        self.overlay_rect = surface.blit(self.overlay_surface, topleft)
+        dirty.append(self.overlay_rect)
+        return dirty
+
+    def dump(self, path: str) -> None:
+        """Write the buffered frames to a CSV file, or the frames and summary to JSON"""
+        frames = {name: self.recent(name) for name in self.columns}
+        count = len(frames['frame'])
+        if path.endswith('.json'):
+            with open(path, 'w') as file:
+                json.dump({'frames': self.frames, 'summary': self.summary(),
+                           'samples': frames}, file, indent=2)
+            return
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.columns)
+            for index in range(count):
+                writer.writerow([f'{frames[name][index]:.4f}' for name in self.columns])
+
+
+class NullProfiler:
+    """Stand-in used when profiling is off; every method is a no-op"""
+    enabled = False
+
+    def begin_frame(self) -> None:
+        pass
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def end_frame(self) -> None:
+        pass
+
+    def draw_overlay(self, surface: pygame.Surface, *args, **kwargs) -> List[pygame.Rect]:
+        return []
+
+    def dump(self, path: str) -> None:
+        pass
+
+
+# Profilers that dump on exit, by file. Games played one after another in
+# the launcher share one, so the dump covers them all and only one exit
+# handler is registered per file.
+_dumping: Dict[str, FrameProfiler] = {}
+
+
+def profiler_from_env(var: str = ENV_VAR) -> Union[FrameProfiler, NullProfiler]:
+    """Profiler configured by an environment variable
+
+    Unset or empty disables profiling. A value ending in .csv or .json
+    enables it and dumps to that file when the program exits; any other
+    value just enables the overlay.
+    """
+    setting = os.environ.get(var, '')
+    if not setting or setting == '0':
+        return NullProfiler()
+    if not setting.endswith(('.csv', '.json')):
+        return FrameProfiler()
+    profiler = _dumping.get(setting)
+    if profiler is None:
+        profiler = _dumping[setting] = FrameProfiler()
+        atexit.register(profiler.dump, setting)
+    else:
+        profiler.overlay_rect = None  # drawn in the previous game's window
+    return profiler
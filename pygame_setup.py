@@ -0,0 +1,18 @@
+"""Shared pygame start-up for the games and the launcher.
+
+pygame.init() starts every SDL subsystem, audio and joysticks included,
+which is slow and can fail on machines without them. The games and the
+launcher need only video and fonts, and the racer the mixer as well.
+"""
+import pygame
+
+
+def init_pygame(mixer: bool = False) -> None:
+    """Start video and fonts, plus the mixer if asked and an audio device exists"""
+    pygame.display.init()
+    pygame.font.init()
+    if mixer:
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            pass  # No audio device; the game still runs silently
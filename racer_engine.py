@@ -0,0 +1,213 @@
+"""Headless racer physics, track and AI drivers.
+
+The track, the cars' physics and the AI drivers live here with no pygame
+dependency, so races can be stepped and benchmarked without a display.
+``moses_jumper_quest.Game`` draws and drives them.
+
+pymunk takes about 25 ms to import, more than the rest of the game logic
+together, so it is imported by the functions that build physics objects
+rather than at module level.
+"""
+import math
+
+# Physics constants
+PLAYER_MASS = 1
+PLAYER_MOMENT = 1000
+PLAYER_ACCELERATION = 1200
+PLAYER_TURN_SPEED = 4.0
+FRICTION = 0.7
+CAR_SIZE = (40, 80)
+
+# Track: an oval between two elliptical walls, centered in the 1280x720 window
+TRACK_CENTER = (640, 360)
+OUTER_RADII = (620, 340)
+INNER_RADII = (380, 150)
+WALL_CORNERS = 64          # corners of each elliptical wall
+WALL_SEGMENT_LENGTH = 80   # longer walls are split so each piece spans few hash cells
+WALL_THICKNESS = 4
+WAYPOINTS = 48             # points on the racing line the AI steers towards
+GRID_LANES = (-45, 45)     # sideways offsets of the two cars in a grid row
+GRID_GAP = 5               # clearance between a car and the one ahead of it on the grid
+
+# AI drivers
+AI_CARS = 11
+AI_ACCELERATION = 1000
+AI_MAX_SPEED = 350         # AI cars only accelerate below this speed
+AI_STEER_GAIN = 2.0        # steering per radian of heading error
+AI_WAYPOINT_RADIUS = 90    # distance at which a waypoint counts as reached
+
+# Collision filtering: cars hit cars and walls, walls only hit cars
+CAR_CATEGORY = 0b01
+WALL_CATEGORY = 0b10
+CAR_MASK = CAR_CATEGORY | WALL_CATEGORY
+WALL_MASK = CAR_CATEGORY
+
+# Broad phase: a spatial hash with cells a bit larger than a car, so a car's
+# bounding box (up to 89 px across when rotated) overlaps at most four cells,
+# and about ten cells per shape so that hash chains stay short
+SPATIAL_HASH_DIM = 120
+SPATIAL_HASH_CELLS_PER_SHAPE = 10
+SPATIAL_HASH_MIN_SHAPES = 100
+
+# Car colors
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+
+def create_space(shapes=0, spatial_hash=True):
+    """A fresh physics world for one race, sized for about `shapes` shapes
+
+    Without spatial_hash the space keeps pymunk's default bounding box tree.
+    """
+    import pymunk
+    space = pymunk.Space()
+    space.gravity = (0.0, 0.0)  # No gravity for top-down racing
+    space.damping = 0.7  # Add some air resistance
+    if spatial_hash:
+        space.use_spatial_hash(SPATIAL_HASH_DIM, SPATIAL_HASH_CELLS_PER_SHAPE *
+                               max(shapes, SPATIAL_HASH_MIN_SHAPES))
+    return space
+
+def wall_pieces(a, b):
+    """Split the wall from a to b into pieces no longer than WALL_SEGMENT_LENGTH"""
+    count = max(1, math.ceil(math.dist(a, b) / WALL_SEGMENT_LENGTH))
+    points = [(a[0] + (b[0] - a[0]) * i / count, a[1] + (b[1] - a[1]) * i / count)
+              for i in range(count + 1)]
+    return list(zip(points, points[1:]))
+
+def add_walls(space, pieces):
+    """Add static wall segments to a space"""
+    import pymunk
+    wall_filter = pymunk.ShapeFilter(categories=WALL_CATEGORY, mask=WALL_MASK)
+    for a, b in pieces:
+        wall = pymunk.Segment(space.static_body, a, b, WALL_THICKNESS)
+        wall.elasticity = 0.5
+        wall.friction = FRICTION
+        wall.filter = wall_filter
+        space.add(wall)
+
+class Track:
+    """An oval circuit: two elliptical walls and a racing line between them"""
+
+    def __init__(self, center=TRACK_CENTER, outer=OUTER_RADII, inner=INNER_RADII):
+        self.center = center
+        self.outer = outer
+        self.inner = inner
+        self.middle = ((outer[0] + inner[0]) / 2, (outer[1] + inner[1]) / 2)
+        # Cars start at the bottom of the oval, driving to the right
+        self.start = math.pi / 2
+        self.outlines = [self.ellipse(radii, WALL_CORNERS) for radii in (outer, inner)]
+        self.walls = [piece for outline in self.outlines
+                      for a, b in zip(outline, outline[1:] + outline[:1])
+                      for piece in wall_pieces(a, b)]
+        self.waypoints = self.ellipse(self.middle, WAYPOINTS)
+        self.slots = self.layout_grid()
+
+    def point(self, radii, theta):
+        return (self.center[0] + radii[0] * math.cos(theta),
+                self.center[1] + radii[1] * math.sin(theta))
+
+    def ellipse(self, radii, count):
+        """Points around an ellipse in driving order, from the start line"""
+        return [self.point(radii, self.start - 2 * math.pi * i / count) for i in range(count)]
+
+    def layout_grid(self):
+        """(x, y, angle) of every starting slot, in rows of two behind the start line
+
+        Rows are placed about a pixel apart along the racing line, skipping
+        any row whose cars would touch the row ahead, until the grid comes
+        round to its own front row.
+        """
+        a, b = self.middle
+        rows = []
+        theta = self.start
+        while theta < self.start + 2 * math.pi:
+            x, y = self.point(self.middle, theta)
+            # Driving direction, which runs towards decreasing theta
+            dx, dy = a * math.sin(theta), -b * math.cos(theta)
+            length = math.hypot(dx, dy)
+            dx, dy = dx / length, dy / length
+            row = [(x - dy * offset, y + dx * offset, math.atan2(dy, dx))
+                   for offset in GRID_LANES]
+            if not rows or rows_clear(rows[-1], row):
+                if len(rows) > 1 and not rows_clear(row, rows[0]):
+                    break
+                rows.append(row)
+            theta += 1 / length
+        return [slot for row in rows for slot in row]
+
+    def grid(self, count):
+        """The first count starting slots, front row first"""
+        if count > len(self.slots):
+            raise ValueError(f'the track has room for {len(self.slots)} cars, not {count}')
+        return self.slots[:count]
+
+def rows_clear(front, back):
+    """Whether each car of a grid row clears the car in its lane of another row
+
+    On a bend the two cars are turned against each other, and the corners
+    of each reach up to half its width further along the track.
+    """
+    length, width = CAR_SIZE  # the car's heading is along the box's x side
+    return all(math.dist(p[:2], q[:2]) >=
+               length + GRID_GAP + width / 2 * abs(math.sin(p[2] - q[2]))
+               for p, q in zip(front, back))
+
+class Car:
+    def __init__(self, x, y, space, angle=0.0, color=RED):
+        import pymunk
+        self.body = pymunk.Body(PLAYER_MASS, PLAYER_MOMENT)
+        self.body.position = x, y
+        self.body.angle = angle
+        self.color = color
+
+        # Create a box shape for the car
+        self.shape = pymunk.Poly.create_box(self.body, CAR_SIZE)
+        self.shape.elasticity = 0.5
+        self.shape.friction = FRICTION
+        self.shape.filter = pymunk.ShapeFilter(categories=CAR_CATEGORY, mask=CAR_MASK)
+
+        space.add(self.body, self.shape)
+
+        # Car properties
+        self.acceleration = 0
+        self.steering = 0
+        self.speed = 0
+
+    def update(self):
+        # Apply forces based on input, along the car's heading
+        force_x = math.cos(self.body.angle) * self.acceleration
+        force_y = math.sin(self.body.angle) * self.acceleration
+        self.body.apply_force_at_world_point((force_x, force_y), self.body.position)
+
+        # Apply steering
+        self.body.angular_velocity = self.steering * PLAYER_TURN_SPEED
+
+        # Update speed
+        self.speed = math.sqrt(self.body.velocity.x**2 + self.body.velocity.y**2)
+
+class AIDriver:
+    """Steers a car along the track's racing line"""
+
+    def __init__(self, car, track, acceleration=AI_ACCELERATION, max_speed=AI_MAX_SPEED):
+        self.car = car
+        self.track = track
+        self.acceleration = acceleration
+        self.max_speed = max_speed
+        # Head for the waypoint after the nearest one
+        position = car.body.position
+        nearest = min(range(len(track.waypoints)),
+                      key=lambda i: math.dist(position, track.waypoints[i]))
+        self.target = (nearest + 1) % len(track.waypoints)
+
+    def update(self):
+        body = self.car.body
+        target_x, target_y = self.track.waypoints[self.target]
+        dx, dy = target_x - body.position.x, target_y - body.position.y
+        if dx * dx + dy * dy < AI_WAYPOINT_RADIUS ** 2:
+            self.target = (self.target + 1) % len(self.track.waypoints)
+
+        # Heading error wrapped to [-pi, pi)
+        error = (math.atan2(dy, dx) - body.angle + math.pi) % (2 * math.pi) - math.pi
+        self.car.steering = max(-1.0, min(1.0, error * AI_STEER_GAIN))
+        self.car.acceleration = self.acceleration if self.car.speed < self.max_speed else 0
@@ -0,0 +1,133 @@
+"""Vectorized Snake: many games advanced in lockstep with NumPy.
+
+The rules mirror SnakeEngine: the same wrapping grid, start position,
+no-reversal turning, growth on the move after eating, and a win when the
+snake fills the board. The state of N games lives in arrays, and every
+step is a handful of whole-batch operations. Cells are flat indices
+y * GRID_WIDTH + x. Each body is a ring buffer of cells with the head at
+head_slot, and a boolean occupancy grid per game gives O(1) collision
+tests.
+
+Every game draws its food positions from its own generator, spawned from
+the batch seed. A game's food sequence therefore depends only on the seed
+and its index, not on the other games in the batch.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from snake_engine import GRID_WIDTH, GRID_HEIGHT, DIRECTIONS, RIGHT
+
+CELLS = GRID_WIDTH * GRID_HEIGHT
+START_CELL = (GRID_HEIGHT // 2) * GRID_WIDTH + GRID_WIDTH // 2
+DIRECTION_STEPS = np.array(DIRECTIONS, dtype=np.int64)    # action -> (dx, dy)
+OPPOSITE = np.array([DIRECTIONS.index((-dx, -dy)) for dx, dy in DIRECTIONS])
+KEEP = -1  # action that keeps the current direction
+
+
+class BatchSnake:
+    def __init__(self, num_envs: int, seed: Optional[int] = None, auto_reset: bool = True):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.rngs = [np.random.default_rng(child)
+                     for child in np.random.SeedSequence(seed).spawn(num_envs)]
+        self.env_index = np.arange(num_envs)
+        self.occupied = np.zeros((num_envs, CELLS), dtype=bool)
+        self.body = np.zeros((num_envs, CELLS), dtype=np.int64)  # ring buffers of cells
+        self.head_slot = np.zeros(num_envs, dtype=np.int64)
+        self.length = np.zeros(num_envs, dtype=np.int64)
+        self.direction = np.zeros(num_envs, dtype=np.int64)
+        self.food = np.zeros(num_envs, dtype=np.int64)     # -1 once the board is full
+        self.grow = np.zeros(num_envs, dtype=bool)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.game_over = np.zeros(num_envs, dtype=bool)
+        self.won = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> None:
+        """Start new games on all boards, or on a boolean mask of boards"""
+        if envs is None:
+            envs = np.ones(self.num_envs, dtype=bool)
+        self.occupied[envs] = False
+        self.occupied[envs, START_CELL] = True
+        self.body[envs, 0] = START_CELL
+        self.head_slot[envs] = 0
+        self.length[envs] = 1
+        self.direction[envs] = DIRECTIONS.index(RIGHT)
+        self.grow[envs] = False
+        self.score[envs] = 0
+        self.steps[envs] = 0
+        self.game_over[envs] = False
+        self.won[envs] = False
+        self.spawn_food(envs)
+
+    def spawn_food(self, envs: np.ndarray) -> np.ndarray:
+        """Put food on a random free cell of each masked board
+
+        Returns the mask of boards that had no free cell left.
+        """
+        idx = np.nonzero(envs)[0]
+        full = np.zeros(self.num_envs, dtype=bool)
+        if not len(idx):
+            return full
+        free = ~self.occupied[idx]
+        counts = free.sum(axis=1)
+        draws = np.array([self.rngs[i].random() for i in idx])
+        # The k-th free cell is where the running count of free cells passes k
+        picks = (draws * counts).astype(np.int64)
+        cells = (free.cumsum(axis=1) > picks[:, None]).argmax(axis=1)
+        self.food[idx] = np.where(counts > 0, cells, -1)
+        full[idx] = counts == 0
+        return full
+
+    def heads(self) -> np.ndarray:
+        """Head cell of every board"""
+        return self.body[self.env_index, self.head_slot]
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn each snake by an action (a DIRECTIONS index or KEEP) and move it
+
+        Returns (food eaten, game over) arrays. With auto_reset, finished
+        boards start a new game before returning.
+        """
+        actions = np.asarray(actions)
+        live = ~self.game_over
+        turning = live & (actions >= 0) & (actions != OPPOSITE[self.direction])
+        self.direction = np.where(turning, actions, self.direction)
+
+        head = self.heads()
+        step = DIRECTION_STEPS[self.direction]
+        new = (((head // GRID_WIDTH + step[:, 1]) % GRID_HEIGHT) * GRID_WIDTH +
+               (head % GRID_WIDTH + step[:, 0]) % GRID_WIDTH)
+        crashed = live & self.occupied[self.env_index, new]
+        self.game_over |= crashed
+        moving = live & ~crashed
+        self.steps += live
+
+        # Look up the tails before the new heads can overwrite their slots
+        idx = np.nonzero(moving)[0]
+        shrinking = ~self.grow[idx]
+        tail_slot = (self.head_slot[idx] - self.length[idx] + 1) % CELLS
+        tails = self.body[idx, tail_slot]
+
+        slot = (self.head_slot[idx] + 1) % CELLS
+        self.head_slot[idx] = slot
+        self.body[idx, slot] = new[idx]
+        self.occupied[idx, new[idx]] = True
+        self.occupied[idx[shrinking], tails[shrinking]] = False
+        self.length[idx[~shrinking]] += 1
+        self.grow[idx] = False
+
+        ate = moving & (new == self.food)
+        self.grow |= ate
+        self.score += ate
+        if ate.any():
+            full = self.spawn_food(ate)
+            self.won |= full
+            self.game_over |= full
+
+        done = self.game_over.copy()
+        if self.auto_reset and done.any():
+            self.reset(done)
+        return ate.astype(np.int64), done
@@ -0,0 +1,151 @@
+"""Headless Snake rules engine.
+
+The snake, the food and the game rules live here with no pygame
+dependency, so games can be stepped as fast as the CPU allows for agents
+and batch evaluation. ``Snake_game.Game`` is a renderer on top of
+SnakeEngine.
+"""
+from __future__ import annotations
+
+import random
+from collections import deque
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # see IMPORT_BUDGET in benchmarks.py
+    from typing import Optional, Tuple
+
+GRID_WIDTH = 40
+GRID_HEIGHT = 30
+
+# Directions, as (dx, dy) steps on the wrapping grid
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+
+
+class FreeCells:
+    """The board cells the snake does not cover, with O(1) add, remove and pick
+
+    Cells live in an array so a random one can be picked by index, and a
+    map from cell to array index lets a cell be removed by swapping the
+    last cell into its slot.
+    """
+
+    def __init__(self, occupied=()):
+        occupied = set(occupied)
+        self.cells = [(x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)
+                      if (x, y) not in occupied]
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def add(self, cell):
+        self.index[cell] = len(self.cells)
+        self.cells.append(cell)
+
+    def remove(self, cell):
+        i = self.index.pop(cell)
+        last = self.cells.pop()
+        if last != cell:
+            self.cells[i] = last
+            self.index[last] = i
+
+    def choice(self, rng=random):
+        """A uniformly random free cell, or None if the board is full"""
+        if not self.cells:
+            return None
+        return self.cells[rng.randrange(len(self.cells))]
+
+
+class Snake:
+    def __init__(self):
+        # Body cells from head to tail, plus the index of the cells it does
+        # not cover, so that moving, growing and self-collision are all O(1)
+        self.positions = deque([(GRID_WIDTH // 2, GRID_HEIGHT // 2)])
+        self.free = FreeCells(self.positions)
+        self.direction = RIGHT
+        self.grow_next = False
+
+    def get_head_position(self):
+        return self.positions[0]
+
+    def update(self):
+        current = self.get_head_position()
+        x, y = self.direction
+        new = ((current[0] + x) % GRID_WIDTH, (current[1] + y) % GRID_HEIGHT)
+
+        # The head never moves onto itself, so this is the old body check
+        if new not in self.free:
+            return False  # Game Over
+
+        self.positions.appendleft(new)
+        self.free.remove(new)
+        if not self.grow_next:
+            self.free.add(self.positions.pop())
+        else:
+            self.grow_next = False
+        return True
+
+    def grow(self):
+        self.grow_next = True
+
+
+class Food:
+    def __init__(self, free_cells=None, rng=random):
+        self.position = (0, 0)
+        self.spawn(free_cells, rng)
+
+    def spawn(self, free_cells=None, rng=random):
+        """Place the food on a random free cell, returning False if there is none"""
+        if free_cells is None:
+            free_cells = FreeCells()
+        self.position = free_cells.choice(rng)
+        return self.position is not None
+
+
+class SnakeEngine:
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random()  # food placement, private to this game
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Start a new game, seeding the food placement if a seed is given"""
+        self.seed = seed
+        self.rng.seed(seed)
+        self.snake = Snake()
+        self.food = Food(self.snake.free, self.rng)
+        self.score = 0
+        self.steps = 0
+        self.game_over = False
+        self.won = False  # the snake filled the whole board
+
+    def turn(self, direction: Tuple[int, int]) -> None:
+        """Head in a new direction, unless it would reverse into the body"""
+        dx, dy = self.snake.direction
+        if direction != (-dx, -dy):
+            self.snake.direction = direction
+
+    def step(self, direction: Optional[Tuple[int, int]] = None) -> int:
+        """Optionally turn, move one cell and return the food eaten (0 or 1)"""
+        if self.game_over:
+            return 0
+        if direction is not None:
+            self.turn(direction)
+        self.steps += 1
+        if not self.snake.update():
+            self.game_over = True
+            return 0
+
+        if self.snake.get_head_position() != self.food.position:
+            return 0
+        self.snake.grow()
+        self.score += 1
+        if not self.food.spawn(self.snake.free, self.rng):
+            self.won = self.game_over = True
+        return 1
@@ -0,0 +1,143 @@
+"""Pre-rendered sprites shared by the games.
+
+Drawing a board with one ``pygame.draw.rect`` call per cell is slow. A
+BlockAtlas renders one surface per color once, converted to the display
+format, so a whole board can be pushed with a single ``Surface.blits`` call.
+Atlases from shared_atlas are kept for the life of the process, so a game
+started again, or warmed up by the launcher, reuses the same sprites.
+
+Rotating a surface every frame is slower still. A RotatedSprite renders an
+image at evenly spaced angles once, so drawing it at any angle is a lookup
+and a blit, and a RotationCache keeps the sprites of several skins within a
+memory budget.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+
+class BlockAtlas:
+    def __init__(self, width: int, height: int, colors: Iterable[Color] = ()):
+        self.size = (width, height)
+        self.sprites: Dict[Color, pygame.Surface] = {}
+        self.unconverted: Set[Color] = set()  # rendered before a display existed
+        for color in colors:
+            self.get(color)
+
+    def get(self, color: Color) -> pygame.Surface:
+        """Return the block sprite for a color, rendering it on first use"""
+        sprite = self.sprites.get(color)
+        if sprite is None:
+            sprite = pygame.Surface(self.size)
+            sprite.fill(color)
+            # Matching the display format makes every later blit a plain copy
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            else:
+                self.unconverted.add(color)
+            self.sprites[color] = sprite
+        return sprite
+
+    def convert(self) -> None:
+        """Convert sprites rendered before the display was opened to its format"""
+        if not self.unconverted or pygame.display.get_surface() is None:
+            return
+        for color in self.unconverted:
+            self.sprites[color] = self.sprites[color].convert()
+        self.unconverted.clear()
+
+    def blit_list(self, cells: Iterable[Tuple[Color, int, int]], cell_size: int,
+                  origin: Tuple[int, int] = (0, 0)) -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """Build a Surface.blits sequence for (color, x, y) grid cells"""
+        get = self.get
+        origin_x, origin_y = origin
+        return [(get(color), (origin_x + x * cell_size, origin_y + y * cell_size))
+                for color, x, y in cells]
+
+    def draw(self, target: pygame.Surface, cells: Iterable[Tuple[Color, int, int]],
+             cell_size: int, origin: Tuple[int, int] = (0, 0)) -> None:
+        """Draw (color, x, y) grid cells onto a surface in one batch"""
+        target.blits(self.blit_list(cells, cell_size, origin), doreturn=False)
+
+
+ANGLE_STEPS = 360  # pre-rendered angles per sprite, one per degree
+
+
+class RotatedSprite:
+    def __init__(self, image: pygame.Surface, steps: int = ANGLE_STEPS):
+        self.steps = steps
+        self.converted = False
+        # Every angle is rotated from the original image, so errors never accumulate
+        self.frames = [pygame.transform.rotate(image, 360 * i / steps) for i in range(steps)]
+        self.convert()
+
+    def convert(self) -> None:
+        """Convert the frames to the display format once a display is open"""
+        if self.converted or pygame.display.get_surface() is None:
+            return
+        self.frames = [frame.convert_alpha() for frame in self.frames]
+        self.converted = True
+
+    @property
+    def nbytes(self) -> int:
+        return sum(frame.get_width() * frame.get_height() * frame.get_bytesize()
+                   for frame in self.frames)
+
+    def rotated(self, degrees: float) -> pygame.Surface:
+        """The image rotated counterclockwise, like pygame.transform.rotate"""
+        return self.frames[round(degrees * self.steps / 360) % self.steps]
+
+    def blit_item(self, degrees: float,
+                  center: Tuple[float, float]) -> Tuple[pygame.Surface, Tuple[int, int]]:
+        """A Surface.blits entry drawing the rotated image centered on a point"""
+        frame = self.rotated(degrees)
+        return frame, (int(center[0]) - frame.get_width() // 2,
+                       int(center[1]) - frame.get_height() // 2)
+
+
+class RotationCache:
+    """Rotated sprites by skin, evicting the least recently used over a byte budget"""
+
+    def __init__(self, max_bytes: int = 64 * 2 ** 20, steps: int = ANGLE_STEPS):
+        self.max_bytes = max_bytes
+        self.steps = steps
+        self.sprites: Dict[Hashable, RotatedSprite] = OrderedDict()
+        self.nbytes = 0
+
+    def get(self, key: Hashable, make_image: Callable[[], pygame.Surface]) -> RotatedSprite:
+        """Return the sprite for a skin, rendering it from make_image() on first use"""
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            sprite.convert()
+            return sprite
+
+        sprite = self.sprites[key] = RotatedSprite(make_image(), self.steps)
+        self.nbytes += sprite.nbytes
+        # The newest sprite is always kept, even if it alone is over budget
+        while self.nbytes > self.max_bytes and len(self.sprites) > 1:
+            _, evicted = self.sprites.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return sprite
+
+    def clear(self) -> None:
+        """Drop every cached sprite"""
+        self.sprites.clear()
+        self.nbytes = 0
+
+
+_atlases: Dict[Tuple[int, int], BlockAtlas] = {}
+
+
+def shared_atlas(width: int, height: int, colors: Iterable[Color] = ()) -> BlockAtlas:
+    """Return the process-wide atlas for a block size, rendering any missing colors"""
+    atlas = _atlases.get((width, height))
+    if atlas is None:
+        atlas = _atlases[(width, height)] = BlockAtlas(width, height)
+    atlas.convert()
+    for color in colors:
+        atlas.get(color)
+    return atlas
@@ -0,0 +1,231 @@
+"""Placement search and a heuristic Tetris player.
+
+The AI works directly on the engine's row bitmasks. For the current piece
+it enumerates every placement reachable from the spawn position by
+rotating, then shifting, then dropping straight down. The best few of those
+(or all of them, with beam_width=None) are expanded with every placement
+of the next piece. Final boards are scored with a weighted sum of aggregate
+height, completed lines, holes and bumpiness. Decisions are memoized in a
+TranspositionCache keyed by the board's Zobrist hash and the two pieces.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from tetris_engine import (TetrisEngine, GRID_WIDTH, GRID_HEIGHT, FULL_ROW, ROTATIONS,
+                           LEFT, RIGHT, ROTATE, DOWN, HARD_DROP, board_hash, column_heights,
+                           landing_y, piece_collides as collides)
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # see IMPORT_BUDGET in benchmarks.py
+    from typing import Hashable, List, Optional, Sequence, Tuple
+
+    Placement = Tuple[int, int, int]  # rotation, x, landing y
+
+SPAWN_X = GRID_WIDTH // 2 - 2
+TABLE_SIZE = 200000
+BEAM_WIDTH = 8  # first-piece candidates expanded with the next piece
+
+# Weights for aggregate height, lines, holes and bumpiness
+DEFAULT_WEIGHTS = (-0.510066, 0.760666, -0.35663, -0.184483)
+
+
+def _distinct_rotations(shape: str) -> List[int]:
+    """Rotation indices with distinct cell layouts, so O is only tried once"""
+    seen = set()
+    rotations = []
+    for index, rotation in enumerate(ROTATIONS[shape]):
+        if rotation.cells not in seen:
+            seen.add(rotation.cells)
+            rotations.append(index)
+    return rotations
+
+
+DISTINCT_ROTATIONS = {shape: _distinct_rotations(shape) for shape in ROTATIONS}
+
+
+def placements(rows: Sequence[int], shape: str, x: int = SPAWN_X, y: int = 0) -> List[Placement]:
+    """Every (rotation, x, landing y) reachable by rotating, shifting, then dropping"""
+    found = []
+    heights = column_heights(rows)
+    for rotation in range(4):
+        if collides(rows, shape, rotation, x, y):
+            break  # later rotations are only reachable through this one
+        if rotation not in DISTINCT_ROTATIONS[shape]:
+            continue
+        for step in (-1, 1):
+            target = x if step == -1 else x + 1
+            while not collides(rows, shape, rotation, target, y):
+                found.append((rotation, target,
+                              landing_y(rows, heights, shape, rotation, target, y)))
+                target += step
+    return found
+
+
+def place(rows: Sequence[int], shape: str, placement: Placement) -> Tuple[List[int], int]:
+    """Lock a piece into a copy of the board, returning (new rows, lines cleared)"""
+    rotation, x, y = placement
+    new_rows = list(rows)
+    for dy, mask in ROTATIONS[shape][rotation].masks[x]:
+        new_rows[y + dy] |= mask
+    kept = [row for row in new_rows if row != FULL_ROW]
+    lines = GRID_HEIGHT - len(kept)
+    if lines:
+        new_rows = [0] * lines + kept
+    return new_rows, lines
+
+
+def board_features(rows: Sequence[int]) -> Tuple[int, int, int]:
+    """Aggregate height, holes and bumpiness of a board"""
+    heights = [0] * GRID_WIDTH
+    covered = 0
+    holes = 0
+    for y, row in enumerate(rows):
+        # Empty cells under any earlier filled cell are holes
+        holes += (covered & ~row).bit_count()
+        new = row & ~covered
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = GRID_HEIGHT - y
+            new ^= low
+        covered |= row
+    bumpiness = sum(abs(heights[i] - heights[i + 1]) for i in range(GRID_WIDTH - 1))
+    return sum(heights), holes, bumpiness
+
+
+class TranspositionCache:
+    """Bounded LRU cache keyed on (board hash, piece, next piece)
+
+    Evaluators may share one instance as long as they would compute the same
+    result for the same key, e.g. AIs with the same weights and search
+    settings.
+    """
+
+    def __init__(self, max_entries: int = TABLE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default=None):
+        """Look up a result, marking it as recently used"""
+        try:
+            value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value) -> None:
+        """Store a result, evicting the least recently used entry when full"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = self.misses = 0
+
+
+# Sentinel telling "not cached" apart from a cached None (no legal placement)
+_MISSING = object()
+
+
+class HeuristicAI:
+    def __init__(self, weights: Tuple[float, float, float, float] = DEFAULT_WEIGHTS,
+                 lookahead: bool = True, beam_width: Optional[int] = BEAM_WIDTH,
+                 cache: Optional[TranspositionCache] = None):
+        self.weights = weights
+        self.lookahead = lookahead
+        self.beam_width = beam_width  # None searches every pair of placements
+        self.cache = cache if cache is not None else TranspositionCache()
+        self.evaluated = 0  # placements scored, for throughput measurements
+
+    def evaluate(self, rows: Sequence[int], lines: int) -> float:
+        """Weighted score of a board reached by clearing lines"""
+        height_weight, lines_weight, holes_weight, bumpiness_weight = self.weights
+        height, holes, bumpiness = board_features(rows)
+        self.evaluated += 1
+        return (height_weight * height + lines_weight * lines +
+                holes_weight * holes + bumpiness_weight * bumpiness)
+
+    def best_value(self, rows: Sequence[int], shape: str) -> float:
+        """Best single-piece score for a piece on a board"""
+        best = float('-inf')
+        for placement in placements(rows, shape):
+            new_rows, lines = place(rows, shape, placement)
+            best = max(best, self.evaluate(new_rows, lines))
+        return best
+
+    def choose(self, rows: Sequence[int], shape: str, next_shape: Optional[str] = None,
+               rows_hash: Optional[int] = None) -> Optional[Placement]:
+        """Best placement of shape, looking one piece ahead when next_shape is known
+
+        Pass the engine's incrementally maintained hash as rows_hash to
+        avoid rehashing the board.
+        """
+        if not self.lookahead:
+            next_shape = None
+        if rows_hash is None:
+            rows_hash = board_hash(rows)
+        key = (rows_hash, shape, next_shape)
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        candidates = []
+        for placement in placements(rows, shape):
+            new_rows, lines = place(rows, shape, placement)
+            candidates.append((self.evaluate(new_rows, lines), placement, new_rows, lines))
+
+        best, best_value = None, float('-inf')
+        if next_shape is not None and self.beam_width is not None:
+            # Only the most promising first placements get the full second ply
+            candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+            del candidates[self.beam_width:]
+        for value, placement, new_rows, lines in candidates:
+            if next_shape is not None:
+                value = self.best_value(new_rows, next_shape) + self.weights[1] * lines
+            if value > best_value:
+                best, best_value = placement, value
+
+        self.cache.put(key, best)
+        return best
+
+
+class AutoPlayer:
+    """Turns AI decisions into one engine action per call
+
+    The target placement is chosen when a piece spawns. Each call then
+    rotates, shifts, or hard-drops towards it, re-reading the live piece so
+    that gravity between calls cannot desynchronise the plan.
+    """
+
+    def __init__(self, ai: Optional[HeuristicAI] = None):
+        self.ai = ai or HeuristicAI()
+        self.planned_piece = None
+        self.target = None
+
+    def __call__(self, engine: TetrisEngine) -> int:
+        piece = engine.current_piece
+        if self.planned_piece != engine.pieces:
+            self.planned_piece = engine.pieces
+            self.target = self.ai.choose(engine.rows, piece['shape'], engine.next_piece,
+                                         engine.hash)
+        if self.target is None:
+            return DOWN
+
+        rotation, x, _ = self.target
+        if piece['rotation'] != rotation:
+            return ROTATE
+        if piece['x'] < x:
+            return RIGHT
+        if piece['x'] > x:
+            return LEFT
+        return HARD_DROP
@@ -0,0 +1,191 @@
+"""Vectorized Tetris: many boards advanced in lockstep with NumPy.
+
+The rules mirror TetrisEngine (same pieces, rotations, spawn position,
+actions and 100/300/500/800 score ladder), but the state of N games lives
+in arrays and every step is a handful of whole-batch operations. Boards use
+the same row-bitmask layout as the engine, one uint16 per row.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from tetris_engine import (GRID_WIDTH, GRID_HEIGHT, FULL_ROW, LINE_SCORES, ROTATIONS,
+                           SHAPE_NAMES, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP,
+                           SLIDE_LEFT, SLIDE_RIGHT)
+
+BOX = 5                   # pieces live in a 5x5 box
+X_OFFSET = BOX - 1        # table index of x == -4
+X_POSITIONS = GRID_WIDTH + BOX - 1
+SPAWN_X = GRID_WIDTH // 2 - 2
+X_INDEXES = np.arange(X_POSITIONS)
+# Every row a piece can occupy, and the board rows under its box at each
+DROP_ROWS = np.arange(GRID_HEIGHT + 1)
+DROP_WINDOWS = DROP_ROWS[:, None] + np.arange(BOX)
+
+
+def _build_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Row masks of every (shape, rotation, x) and whether that x is in bounds"""
+    masks = np.zeros((len(SHAPE_NAMES), 4, X_POSITIONS, BOX), dtype=np.uint16)
+    valid = np.zeros((len(SHAPE_NAMES), 4, X_POSITIONS), dtype=bool)
+    for s, name in enumerate(SHAPE_NAMES):
+        for r, rotation in enumerate(ROTATIONS[name]):
+            for x, rows in rotation.masks.items():
+                valid[s, r, x + X_OFFSET] = True
+                for dy, mask in rows:
+                    masks[s, r, x + X_OFFSET, dy] = mask
+    return masks, valid
+
+
+PIECE_MASKS, PIECE_VALID = _build_tables()
+SCORE_TABLE = np.array(LINE_SCORES, dtype=np.int64)
+
+
+class BatchTetris:
+    def __init__(self, num_envs: int, seed: Optional[int] = None, auto_reset: bool = True):
+        self.num_envs = num_envs
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+        self.env_index = np.arange(num_envs)
+        self.box_rows = np.arange(BOX)
+        # Board rows plus BOX full rows below the floor, so windows never go out of range
+        self.boards = np.zeros((num_envs, GRID_HEIGHT + BOX), dtype=np.uint16)
+        self.shape = np.zeros(num_envs, dtype=np.intp)
+        self.next_shape = np.zeros(num_envs, dtype=np.intp)
+        self.rotation = np.zeros(num_envs, dtype=np.intp)
+        self.x = np.zeros(num_envs, dtype=np.intp)
+        self.y = np.zeros(num_envs, dtype=np.intp)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.lines = np.zeros(num_envs, dtype=np.int64)
+        self.level = np.ones(num_envs, dtype=np.int64)
+        self.pieces = np.zeros(num_envs, dtype=np.int64)
+        self.game_over = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    def reset(self, envs: Optional[np.ndarray] = None) -> None:
+        """Start new games on all boards, or on a boolean mask of boards"""
+        if envs is None:
+            envs = np.ones(self.num_envs, dtype=bool)
+        self.boards[envs, :GRID_HEIGHT] = 0
+        self.boards[envs, GRID_HEIGHT:] = FULL_ROW
+        self.score[envs] = 0
+        self.lines[envs] = 0
+        self.level[envs] = 1
+        self.pieces[envs] = 0
+        self.game_over[envs] = False
+        self.next_shape[envs] = self.rng.integers(len(SHAPE_NAMES), size=int(envs.sum()))
+        self.spawn(envs)
+
+    def spawn(self, envs: np.ndarray) -> None:
+        """Bring in the next piece on the masked boards"""
+        count = int(envs.sum())
+        self.shape[envs] = self.next_shape[envs]
+        self.next_shape[envs] = self.rng.integers(len(SHAPE_NAMES), size=count)
+        self.rotation[envs] = 0
+        self.x[envs] = SPAWN_X
+        self.y[envs] = 0
+        self.game_over |= envs & self.collides(self.rotation, self.x, self.y)
+
+    def collides(self, rotation: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Vectorized check_collision of every board's piece at a candidate pose"""
+        x_index = np.clip(x + X_OFFSET, 0, X_POSITIONS - 1)
+        masks = PIECE_MASKS[self.shape, rotation, x_index]
+        windows = self.boards[self.env_index[:, None], y[:, None] + self.box_rows]
+        return ~PIECE_VALID[self.shape, rotation, x_index] | (windows & masks).any(axis=1)
+
+    def slide_columns(self, idx: np.ndarray, slide: np.ndarray) -> np.ndarray:
+        """Column each indexed board's piece would slide to, left for -1 and right for 1
+
+        Every column at the piece's row is tested at once; the piece stops
+        next to the nearest blocked one. The table has no valid position at
+        either edge, so there always is one.
+        """
+        shape, rotation = self.shape[idx], self.rotation[idx]
+        windows = self.boards[idx[:, None], self.y[idx, None] + self.box_rows]
+        hits = ~PIECE_VALID[shape, rotation] | (PIECE_MASKS[shape, rotation]
+                                                & windows[:, None, :]).any(axis=2)
+        current = self.x[idx, None] + X_OFFSET
+        right = (hits & (X_INDEXES > current)).argmax(axis=1) - 1
+        left = X_POSITIONS - (hits & (X_INDEXES < current))[:, ::-1].argmax(axis=1)
+        return np.where(slide[idx] > 0, right, left) - X_OFFSET
+
+    def landing_rows(self, idx: np.ndarray) -> np.ndarray:
+        """Row each indexed board's piece would hard-drop to
+
+        Every row below the piece is tested at once; the piece lands on the
+        row above the first collision. The full rows under the floor make
+        sure there always is one.
+        """
+        masks = PIECE_MASKS[self.shape[idx], self.rotation[idx], self.x[idx] + X_OFFSET]
+        windows = self.boards[idx][:, DROP_WINDOWS]
+        hits = (windows & masks[:, None, :]).any(axis=2) & (DROP_ROWS > self.y[idx, None])
+        return hits.argmax(axis=1) - 1
+
+    def lock(self, envs: np.ndarray) -> np.ndarray:
+        """Freeze the masked pieces, clear full rows and return rows cleared per board"""
+        idx = np.nonzero(envs)[0]
+        rows = self.y[idx, None] + self.box_rows
+        masks = PIECE_MASKS[self.shape[idx], self.rotation[idx], self.x[idx] + X_OFFSET]
+        self.boards[idx[:, None], rows] |= masks
+
+        # Stable-sort full rows to the top of each board, then blank them
+        board = self.boards[:, :GRID_HEIGHT]
+        full = board == FULL_ROW
+        cleared = full.sum(axis=1)
+        if cleared.any():
+            order = np.argsort(~full, axis=1, kind='stable')
+            compacted = np.take_along_axis(board, order, axis=1)
+            compacted[np.arange(GRID_HEIGHT) < cleared[:, None]] = 0
+            self.boards[:, :GRID_HEIGHT] = compacted
+
+        self.score += SCORE_TABLE[cleared]
+        self.lines += cleared
+        self.level += self.score >= self.level * 1000
+        self.pieces += envs
+        self.spawn(envs)
+        return cleared
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Apply one action per board
+
+        Returns (score gained, rows cleared, game over) arrays. With
+        auto_reset, finished boards start a new game before returning.
+        """
+        actions = np.asarray(actions)
+        live = ~self.game_over
+        score_before = self.score.copy()
+
+        dx = np.where(actions == LEFT, -1, 0) + np.where(actions == RIGHT, 1, 0)
+        dx[~live] = 0
+        moved = (dx != 0) & ~self.collides(self.rotation, self.x + dx, self.y)
+        self.x += np.where(moved, dx, 0)
+
+        slide = np.where(actions == SLIDE_LEFT, -1, 0) + np.where(actions == SLIDE_RIGHT, 1, 0)
+        sliding = live & (slide != 0)
+        if sliding.any():
+            idx = np.nonzero(sliding)[0]
+            self.x[idx] = self.slide_columns(idx, slide)
+
+        turning = live & (actions == ROTATE)
+        rotated = (self.rotation + 1) % 4
+        turned = turning & ~self.collides(rotated, self.x, self.y)
+        self.rotation = np.where(turned, rotated, self.rotation)
+
+        dropping = live & (actions == DOWN)
+        landed = dropping & self.collides(self.rotation, self.x, self.y + 1)
+        self.y += dropping & ~landed
+
+        falling = live & (actions == HARD_DROP)
+        if falling.any():
+            idx = np.nonzero(falling)[0]
+            self.y[idx] = self.landing_rows(idx)
+        landed |= falling
+
+        cleared = np.zeros(self.num_envs, dtype=np.int64)
+        if landed.any():
+            cleared = self.lock(landed)
+
+        reward = self.score - score_before
+        done = self.game_over.copy()
+        if self.auto_reset and done.any():
+            self.reset(done)
+        return reward, cleared, done
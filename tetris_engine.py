@@ -0,0 +1,493 @@
+"""Headless Tetris rules engine.
+
+The engine owns the board state and the game rules and has no pygame
+dependency, so it can be stepped as fast as the CPU allows for AI training
+and balance testing. ``tetris_game.Tetris`` is a renderer on top of it.
+"""
+from __future__ import annotations
+
+import random
+from collections import namedtuple
+
+from tetris_pieces import PieceGenerator, make_generator
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # see IMPORT_BUDGET in benchmarks.py
+    from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+    Cells = Tuple[Tuple[int, int], ...]
+
+# Constants
+GRID_WIDTH = 10
+GRID_HEIGHT = 20
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+CYAN = (0, 255, 255)    # I piece
+YELLOW = (255, 255, 0)  # O piece
+PURPLE = (128, 0, 128)  # T piece
+BLUE = (0, 0, 255)      # J piece
+ORANGE = (255, 165, 0)  # L piece
+GREEN = (0, 255, 0)     # S piece
+RED = (255, 0, 0)       # Z piece
+
+# Tetromino shapes and their colors
+SHAPES = {
+    'I': [['.....',
+           '.....',
+           'XXXX.',
+           '.....',
+           '.....'], CYAN],
+    'O': [['.....',
+           '.....',
+           '.XX..',
+           '.XX..',
+           '.....'], YELLOW],
+    'T': [['.....',
+           '.....',
+           '.XXX.',
+           '..X..',
+           '.....'], PURPLE],
+    'L': [['.....',
+           '.....',
+           '.XXX.',
+           '.X...',
+           '.....'], BLUE],
+    'J': [['.....',
+           '.....',
+           '.XXX.',
+           '...X.',
+           '.....'], ORANGE],
+    'S': [['.....',
+           '.....',
+           '..XX.',
+           '.XX..',
+           '.....'], GREEN],
+    'Z': [['.....',
+           '.....',
+           '.XX..',
+           '..XX.',
+           '.....'], RED]
+}
+SHAPE_NAMES = tuple(SHAPES)
+
+# Board rows are stored as integer bitmasks, bit x set meaning column x is filled
+FULL_ROW = (1 << GRID_WIDTH) - 1
+
+
+class PieceRotation(namedtuple('PieceRotation', 'cells bounds masks bottoms')):
+    """One orientation of a tetromino, precomputed for the hot paths
+
+    cells: (x, y) offsets in the 5x5 box
+    bounds: (min_x, min_y, max_x, max_y)
+    masks: x position -> (dy, row mask) pairs
+    bottoms: (x, lowest y) of each column
+    """
+    __slots__ = ()
+
+
+def _template_cells(template: List[str]) -> Cells:
+    """Return the (x, y) offsets of the filled cells of a 5x5 template"""
+    return tuple((x, y) for y, row in enumerate(template)
+                 for x, cell in enumerate(row) if cell == 'X')
+
+
+def _rotate_cells(cells: Cells) -> Cells:
+    """Rotate cell offsets a quarter turn clockwise about the template center"""
+    return tuple(sorted((4 - y, x) for x, y in cells))
+
+
+def _row_masks(cells: Cells) -> Dict[int, Tuple[Tuple[int, int], ...]]:
+    """Map every in-bounds x position of a piece to its (dy, row mask) pairs"""
+    min_x = min(x for x, _ in cells)
+    max_x = max(x for x, _ in cells)
+    masks = {}
+    for px in range(-min_x, GRID_WIDTH - max_x):
+        rows = {}
+        for x, y in cells:
+            rows[y] = rows.get(y, 0) | (1 << (px + x))
+        masks[px] = tuple(sorted(rows.items()))
+    return masks
+
+
+def _build_rotations(name: str) -> Tuple[PieceRotation, ...]:
+    """Precompute all four orientations of a piece"""
+    cells = _template_cells(SHAPES[name][0])
+    rotations = []
+    for _ in range(4):
+        bounds = (min(x for x, _ in cells), min(y for _, y in cells),
+                  max(x for x, _ in cells), max(y for _, y in cells))
+        bottoms = {}
+        for x, y in cells:
+            bottoms[x] = max(y, bottoms.get(x, y))
+        rotations.append(PieceRotation(cells, bounds, _row_masks(cells),
+                                       tuple(sorted(bottoms.items()))))
+        # The O piece is symmetric but off-center in its box, so it must not turn
+        if name != 'O':
+            cells = _rotate_cells(cells)
+    return tuple(rotations)
+
+
+# All four orientations of every piece, indexed as ROTATIONS[shape][rotation]
+ROTATIONS = {name: _build_rotations(name) for name in SHAPES}
+
+
+def piece_collides(rows: Sequence[int], shape: str, rotation: int, x: int, y: int) -> bool:
+    """Check if a piece placed at (x, y) on a board would overlap a wall or the stack"""
+    masks = ROTATIONS[shape][rotation].masks.get(x)
+    if masks is None:
+        return True
+    for dy, mask in masks:
+        abs_y = y + dy
+        if abs_y >= GRID_HEIGHT or (abs_y >= 0 and rows[abs_y] & mask):
+            return True
+    return False
+
+
+def column_heights(rows: Sequence[int]) -> List[int]:
+    """Height of every column, from the highest filled cell to the floor"""
+    heights = [0] * GRID_WIDTH
+    covered = 0
+    for y, row in enumerate(rows):
+        new = row & ~covered
+        while new:
+            low = new & -new
+            heights[low.bit_length() - 1] = GRID_HEIGHT - y
+            new ^= low
+        covered |= row
+        if covered == FULL_ROW:
+            break
+    return heights
+
+
+def landing_y(rows: Sequence[int], heights: Sequence[int], shape: str,
+              rotation: int, x: int, y: int) -> int:
+    """Row where a piece dropped straight down from (x, y) comes to rest
+
+    Uses the column heights, so it costs one lookup per piece column. A
+    piece tucked under an overhang falls back to stepping down row by row.
+    """
+    landing = GRID_HEIGHT
+    for column, bottom in ROTATIONS[shape][rotation].bottoms:
+        landing = min(landing, GRID_HEIGHT - heights[x + column] - 1 - bottom)
+    if landing >= y:
+        return landing
+    while not piece_collides(rows, shape, rotation, x, y + 1):
+        y += 1
+    return y
+
+
+def slide_distance(rows: Sequence[int], shape: str, rotation: int, x: int, y: int,
+                   dx: int) -> int:
+    """Columns a piece at (x, y) can slide in direction dx before it is blocked
+
+    Every row of a tetromino is one contiguous run of cells, so only its
+    leading cell can meet an obstacle. The nearest obstacle ahead of it is
+    found with bit tricks on each board row, with no per-column collision
+    checks.
+    """
+    distance = GRID_WIDTH
+    for dy, mask in ROTATIONS[shape][rotation].masks[x]:
+        row = rows[y + dy] if y + dy >= 0 else 0
+        if dx > 0:
+            # Lowest obstacle above the leading cell, the right wall included
+            ahead = (row | (1 << GRID_WIDTH)) >> mask.bit_length()
+            free = (ahead & -ahead).bit_length() - 1
+        else:
+            # Highest obstacle below the leading cell; the left wall is at -1
+            lead = (mask & -mask).bit_length() - 1
+            free = lead - (row & ((1 << lead) - 1)).bit_length()
+        distance = min(distance, free)
+    return distance
+
+
+# Zobrist hashing: every cell has a fixed random 64-bit key and a board hashes
+# to the XOR of the keys of its filled cells, so changes are hashed
+# incrementally. Each row has a table of the keys of all 2**GRID_WIDTH row
+# masks (20 x 1024 ints for the standard board), so a row's key is one lookup.
+
+
+def _build_zobrist_tables(seed: int = 0x7E7215) -> List[List[int]]:
+    """Per row, the XOR of the cell keys for every row mask"""
+    rng = random.Random(seed)  # fixed seed keeps hashes stable across runs
+    tables = []
+    for _ in range(GRID_HEIGHT):
+        table = [0]
+        # Doubling: masks with bit x set are the masks below 1 << x plus cell x
+        for _ in range(GRID_WIDTH):
+            key = rng.getrandbits(64)
+            table += [value ^ key for value in table]
+        tables.append(table)
+    return tables
+
+
+ZOBRIST_TABLES = _build_zobrist_tables()
+
+
+def row_key(y: int, mask: int) -> int:
+    """Zobrist key of the filled cells of a row mask at row y"""
+    return ZOBRIST_TABLES[y][mask]
+
+
+def board_hash(rows: Sequence[int]) -> int:
+    """Zobrist hash of a whole board, computed from scratch"""
+    key = 0
+    for y, mask in enumerate(rows):
+        if mask:
+            key ^= row_key(y, mask)
+    return key
+
+# Points awarded for clearing 0-4 rows with one piece
+LINE_SCORES = (0, 100, 300, 500, 800)
+
+# Actions accepted by TetrisEngine.step
+NOOP = 0
+LEFT = 1
+RIGHT = 2
+ROTATE = 3
+DOWN = 4
+HARD_DROP = 5
+SLIDE_LEFT = 6   # shift all the way to the left, e.g. auto repeat with no delay
+SLIDE_RIGHT = 7
+ACTIONS = (NOOP, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP, SLIDE_LEFT, SLIDE_RIGHT)
+
+
+class TetrisEngine:
+    # Immutable attributes copied as-is by snapshot and restore
+    _SCALAR_STATE = ('seed', 'board_version', 'hash', 'next_piece', 'score', 'level', 'lines',
+                     'pieces', 'game_over', 'fall_speed', 'fall_timer', 'ticks')
+
+    def __init__(self, seed: Optional[int] = None,
+                 generator: Union[str, PieceGenerator] = 'uniform'):
+        self.generator = make_generator(generator, SHAPE_NAMES)
+        self.reset(seed)
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """Start a new game, seeding the piece sequence if a seed is given"""
+        self.seed = seed
+        self.generator.reseed(seed)
+        # Occupancy lives in the row bitmasks; colors are only read for drawing
+        self.rows = [0] * GRID_HEIGHT
+        self.heights = [0] * GRID_WIDTH  # filled height of each column
+        self.grid = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
+        self.board_version = 0  # bumped whenever the locked stack changes
+        self.hash = 0           # Zobrist hash of the locked stack
+        self.current_piece = None
+        self.next_piece = None
+        self.score = 0
+        self.level = 1
+        self.lines = 0
+        self.pieces = 0
+        self.game_over = False
+        self.fall_speed = 1000  # milliseconds
+        self.fall_timer = 0.0   # milliseconds since the piece last fell
+        self.ticks = 0          # logic ticks played
+        self.new_piece()
+
+    def new_piece(self) -> None:
+        """Create a new tetromino piece"""
+        self.current_piece = {
+            'shape': self.generator.next(),
+            'rotation': 0,
+            'x': GRID_WIDTH // 2 - 2,
+            'y': 0
+        }
+        self.next_piece = self.generator.preview(1)[0]
+
+        # Check if game is over
+        if self.check_collision():
+            self.game_over = True
+
+    def snapshot(self) -> dict:
+        """Capture the full game state, including the piece sequence"""
+        state = {name: getattr(self, name) for name in self._SCALAR_STATE}
+        state['rows'] = self.rows[:]
+        state['heights'] = self.heights[:]
+        state['grid'] = [row[:] for row in self.grid]
+        state['current_piece'] = dict(self.current_piece)
+        state['generator'] = self.generator.get_state()
+        return state
+
+    def restore(self, state: dict) -> None:
+        """Return to a state captured with snapshot"""
+        for name in self._SCALAR_STATE:
+            setattr(self, name, state[name])
+        self.rows = state['rows'][:]
+        self.heights = state['heights'][:]
+        self.grid = [row[:] for row in state['grid']]
+        self.current_piece = dict(state['current_piece'])
+        self.generator.set_state(state['generator'])
+
+    def upcoming(self, count: int) -> List[str]:
+        """Return the next count pieces after the current one"""
+        return self.generator.preview(count)
+
+    def check_collision(self) -> bool:
+        """Check if the current piece collides with anything"""
+        piece = self.current_piece
+        return self.collides(piece['shape'], piece['rotation'], piece['x'], piece['y'])
+
+    def collides(self, shape: str, rotation: int, x: int, y: int) -> bool:
+        """Check if a piece placed at (x, y) would overlap a wall or the stack"""
+        return piece_collides(self.rows, shape, rotation, x, y)
+
+    def landing_row(self) -> int:
+        """Row the current piece would land on if dropped now, for hard drop and ghost"""
+        piece = self.current_piece
+        return landing_y(self.rows, self.heights, piece['shape'], piece['rotation'],
+                         piece['x'], piece['y'])
+
+    def move(self, dx: int) -> bool:
+        """Shift the current piece sideways, returning False if blocked"""
+        self.current_piece['x'] += dx
+        if self.check_collision():
+            self.current_piece['x'] -= dx
+            return False
+        return True
+
+    def shift(self, dx: int, limit: int = GRID_WIDTH) -> int:
+        """Slide the current piece up to limit columns in direction dx, returning how far it went"""
+        piece = self.current_piece
+        distance = min(limit, slide_distance(self.rows, piece['shape'], piece['rotation'],
+                                             piece['x'], piece['y'], dx))
+        piece['x'] += dx * distance
+        return distance
+
+    def rotate_piece(self) -> None:
+        """Rotate the current piece"""
+        original_rotation = self.current_piece['rotation']
+        self.current_piece['rotation'] = (self.current_piece['rotation'] + 1) % 4
+
+        if self.check_collision():
+            self.current_piece['rotation'] = original_rotation
+
+    def soft_drop(self) -> int:
+        """Move the current piece down one row, locking it if it has landed"""
+        self.current_piece['y'] += 1
+        if self.check_collision():
+            self.current_piece['y'] -= 1
+            return self.lock_piece()
+        return 0
+
+    def hard_drop(self) -> int:
+        """Drop the current piece straight to its landing row and lock it"""
+        self.current_piece['y'] = self.landing_row()
+        return self.lock_piece()
+
+    def lock_piece(self) -> int:
+        """Freeze the current piece, clear rows and spawn the next piece"""
+        self.freeze_piece()
+        rows_cleared = len(self.clear_rows())
+        self.pieces += 1
+        self.new_piece()
+        return rows_cleared
+
+    def freeze_piece(self) -> None:
+        """Freeze the current piece in place"""
+        shape = self.current_piece['shape']
+        piece_x = self.current_piece['x']
+        piece_y = self.current_piece['y']
+        piece_color = SHAPES[shape][1]
+        rotation = ROTATIONS[shape][self.current_piece['rotation']]
+
+        for dy, mask in rotation.masks[piece_x]:
+            self.rows[piece_y + dy] |= mask
+            self.hash ^= row_key(piece_y + dy, mask)
+        heights = self.heights
+        for x, y in rotation.cells:
+            self.grid[piece_y + y][piece_x + x] = piece_color
+            heights[piece_x + x] = max(heights[piece_x + x], GRID_HEIGHT - piece_y - y)
+        self.board_version += 1
+
+    def clear_rows(self) -> List[int]:
+        """Clear completed rows, update score and return their indices"""
+        rows = self.rows
+        cleared = [y for y in range(GRID_HEIGHT) if rows[y] == FULL_ROW]
+        rows_cleared = len(cleared)
+
+        if rows_cleared:
+            # Compact in one pass: keep the other rows in order, refill the top
+            grid = self.grid
+            kept = [y for y in range(GRID_HEIGHT) if rows[y] != FULL_ROW]
+
+            # Rehash only the removed rows and the rows that move down
+            tables = ZOBRIST_TABLES
+            key = self.hash
+            for y in cleared:
+                key ^= tables[y][FULL_ROW]
+            for new_y, y in enumerate(kept, rows_cleared):
+                mask = rows[y]
+                if new_y != y and mask:
+                    key ^= tables[y][mask] ^ tables[new_y][mask]
+            self.hash = key
+
+            rows[:] = [0] * rows_cleared + [rows[y] for y in kept]
+            grid[:] = ([[BLACK] * GRID_WIDTH for _ in range(rows_cleared)] +
+                       [grid[y] for y in kept])
+
+            # Columns standing above every cleared row just sink; the rest
+            # topped out in the highest cleared row and are rescanned together
+            heights = self.heights
+            top = GRID_HEIGHT - cleared[0]
+            rescan = 0
+            for x in range(GRID_WIDTH):
+                if heights[x] > top:
+                    heights[x] -= rows_cleared
+                else:
+                    heights[x] = 0
+                    rescan |= 1 << x
+            for y in range(rows_cleared, GRID_HEIGHT):
+                found = rows[y] & rescan
+                while found:
+                    low = found & -found
+                    heights[low.bit_length() - 1] = GRID_HEIGHT - y
+                    found ^= low
+                rescan &= ~rows[y]
+                if not rescan:
+                    break
+            self.board_version += 1
+
+        # Update score
+        self.score += LINE_SCORES[rows_cleared]
+        self.lines += rows_cleared
+
+        # Update level
+        if self.score >= self.level * 1000:
+            self.level += 1
+            self.fall_speed = max(100, 1000 - (self.level - 1) * 100)
+
+        return cleared
+
+    def step(self, action: int) -> int:
+        """Apply one action and return the number of rows it cleared"""
+        if self.game_over:
+            return 0
+        if action == LEFT:
+            self.move(-1)
+        elif action == RIGHT:
+            self.move(1)
+        elif action == ROTATE:
+            self.rotate_piece()
+        elif action == DOWN:
+            return self.soft_drop()
+        elif action == HARD_DROP:
+            return self.hard_drop()
+        elif action == SLIDE_LEFT:
+            self.shift(-1)
+        elif action == SLIDE_RIGHT:
+            self.shift(1)
+        return 0
+
+    def tick(self, dt: float) -> int:
+        """Advance gravity by dt milliseconds and return the rows cleared"""
+        self.ticks += 1
+        if self.game_over:
+            return 0
+        self.fall_timer += dt
+        if self.fall_timer >= self.fall_speed:
+            # Keep the leftover time so falls hold their exact period at any tick
+            # rate; the modulo also stops a level-up speedup causing a burst of falls
+            self.fall_timer %= self.fall_speed
+            return self.soft_drop()
+        return 0
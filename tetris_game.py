@@ -1,103 +1,141 @@
-import pygame
+import os
 import random
-from typing import List, Tuple
-
-# Initialize Pygame
-pygame.init()
+import time
+import pygame
+from itertools import groupby
+from typing import List, Optional
+from tetris_engine import (TetrisEngine, GRID_WIDTH, GRID_HEIGHT, SHAPES, ROTATIONS,
+                           BLACK, WHITE, LEFT, RIGHT, ROTATE, DOWN, HARD_DROP)
+from text_cache import TextLabel, get_font, render_text
+from sprite_atlas import BlockAtlas, shared_atlas
+from tetris_input import InputHandler, DAS_MS, ARR_MS
+from tetris_replay import Recording
+from tetris_ai import AutoPlayer
+from profiler import profiler_from_env
+from pygame_setup import init_pygame
 
 # Constants
 BLOCK_SIZE = 30
-GRID_WIDTH = 10
-GRID_HEIGHT = 20
 SCREEN_WIDTH = BLOCK_SIZE * (GRID_WIDTH + 6)  # Extra space for next piece display
 SCREEN_HEIGHT = BLOCK_SIZE * GRID_HEIGHT
+PLAYFIELD_RECT = pygame.Rect(0, 0, GRID_WIDTH * BLOCK_SIZE, GRID_HEIGHT * BLOCK_SIZE)
+PREVIEW_RECT = pygame.Rect(GRID_WIDTH * BLOCK_SIZE + 20, 50, 5 * BLOCK_SIZE, 5 * BLOCK_SIZE)
+SCORE_RECT = pygame.Rect(GRID_WIDTH * BLOCK_SIZE + 20, 200, 6 * BLOCK_SIZE - 20, 70)
+PROFILER_POS = (GRID_WIDTH * BLOCK_SIZE + 10, 300)
+
+# Timing
+TICK_RATE = 60         # logic ticks per second
+MAX_FPS = 60           # render cap, 0 for uncapped
+MAX_FRAME_TIME = 250   # milliseconds of lag simulated per frame at most
 
-# Colors
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-CYAN = (0, 255, 255)    # I piece
-YELLOW = (255, 255, 0)  # O piece
-PURPLE = (128, 0, 128)  # T piece
-BLUE = (0, 0, 255)      # J piece
-ORANGE = (255, 165, 0)  # L piece
-GREEN = (0, 255, 0)     # S piece
-RED = (255, 0, 0)       # Z piece
-
-# Tetromino shapes and their colors
-SHAPES = {
-    'I': [['.....',
-           '.....',
-           'XXXX.',
-           '.....',
-           '.....'], CYAN],
-    'O': [['.....',
-           '.....',
-           '.XX..',
-           '.XX..',
-           '.....'], YELLOW],
-    'T': [['.....',
-           '.....',
-           '.XXX.',
-           '..X..',
-           '.....'], PURPLE],
-    'L': [['.....',
-           '.....',
-           '.XXX.',
-           '.X...',
-           '.....'], BLUE],
-    'J': [['.....',
-           '.....',
-           '.XXX.',
-           '...X.',
-           '.....'], ORANGE],
-    'S': [['.....',
-           '.....',
-           '..XX.',
-           '.XX..',
-           '.....'], GREEN],
-    'Z': [['.....',
-           '.....',
-           '.XX..',
-           '..XX.',
-           '.....'], RED]
+# Keyboard bindings for the engine actions
+KEY_ACTIONS = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: ROTATE,
+    pygame.K_DOWN: DOWN,
+    pygame.K_SPACE: HARD_DROP,
 }
+SHIFTS = {LEFT: -1, RIGHT: 1}
+FONT_SIZES = (36, 48)  # HUD and overlay screens
+
+# Every session played through play() is recorded, so a player's bug report
+# can come with its replay. TETRIS_RECORD names another directory, or 0
+# turns recording off.
+RECORD_ENV_VAR = 'TETRIS_RECORD'
+RECORD_DIR = 'replays'
+
+
+def now_ms() -> float:
+    """Monotonic clock in milliseconds, usable without pygame.init()"""
+    return time.perf_counter() * 1000
+
+
+def ghost_color(color):
+    """Dimmed piece color used for the landing preview"""
+    return tuple(channel // 4 for channel in color)
+
+
+def block_atlas() -> BlockAtlas:
+    """Shared sprites for the stack, the pieces and their ghosts"""
+    piece_colors = [color for _, color in SHAPES.values()]
+    return shared_atlas(BLOCK_SIZE - 1, BLOCK_SIZE - 1,
+                        [BLACK] + piece_colors + [ghost_color(c) for c in piece_colors])
+
+
+def preload() -> None:
+    """Load the fonts and sprites Tetris uses before its window opens"""
+    pygame.font.init()
+    for size in FONT_SIZES:
+        get_font(size)
+    block_atlas()
+
+
+def record_dir_from_env(var: str = RECORD_ENV_VAR) -> Optional[str]:
+    """Directory to record sessions in, or None when the variable is 0 or empty"""
+    setting = os.environ.get(var, RECORD_DIR)
+    return None if setting in ('', '0') else setting
+
+
+def play(profiler=None, record_dir: Optional[str] = None) -> None:
+    """Run Tetris from its start screen until the player quits; pygame stays up for the launcher
+
+    Sessions are recorded to record_dir, by default the one TETRIS_RECORD names.
+    """
+    if record_dir is None:
+        record_dir = record_dir_from_env()
+    Tetris(profiler=profiler, record_dir=record_dir).run()
+
 
 class Tetris:
-    def __init__(self):
+    def __init__(self, tick_rate: int = TICK_RATE, max_fps: int = MAX_FPS,
+                 render: bool = True, interpolate: bool = False,
+                 seed: Optional[int] = None, generator: str = 'uniform',
+                 record_dir: Optional[str] = None, autoplay: bool = False,
+                 ghost: bool = True, das: float = DAS_MS, arr: float = ARR_MS,
+                 profiler=None):
+        self.engine = TetrisEngine(seed, generator)
+        self.tick_ms = 1000 / tick_rate
+        self.max_fps = max_fps
+        self.render = render
+        self.interpolate = interpolate  # slide the falling piece between rows
+        self.ghost = ghost              # show where the piece would hard-drop
+        self.input = InputHandler(das, arr)
+        self.record_dir = record_dir
+        self.recording = None
+        self.autoplayer = AutoPlayer() if autoplay else None
+        self.profiler = profiler if profiler is not None else profiler_from_env()
+        self.start_game(seed)
+        if not render:
+            return
+
+        init_pygame()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption('Tetris')
-        self.clock = pygame.time.Clock()
-        self.grid = [[BLACK for _ in range(GRID_WIDTH)] for _ in range(GRID_HEIGHT)]
-        self.current_piece = None
-        self.next_piece = None
-        self.score = 0
-        self.level = 1
-        self.game_over = False
-        self.fall_speed = 1000  # milliseconds
-        self.last_fall_time = 0
-        
-    def new_piece(self) -> None:
-        """Create a new tetromino piece"""
-        if not self.next_piece:
-            self.next_piece = random.choice(list(SHAPES.keys()))
-        self.current_piece = {
-            'shape': self.next_piece,
-            'rotation': 0,
-            'x': GRID_WIDTH // 2 - 2,
-            'y': 0
-        }
-        self.next_piece = random.choice(list(SHAPES.keys()))
-        
-        # Check if game is over
-        if self.check_collision():
-            self.game_over = True
 
-    def show_start_screen(self) -> None:
-        """Display the welcome message"""
+        # Cached image of the locked stack; only the cells that change each
+        # frame are re-blitted and pushed to the display
+        self.stack_surface = pygame.Surface(PLAYFIELD_RECT.size)
+        self.blocks = block_atlas()
+        self.score_label = TextLabel('Score: {}', 36, WHITE)
+        self.level_label = TextLabel('Level: {}', 36, WHITE)
+        self.invalidate_display()
+
+    def invalidate_display(self) -> None:
+        """Force a full redraw on the next frame, e.g. after an overlay screen"""
+        self.full_redraw = True
+        self.stack_version = None
+        self.drawn_piece = set()
+        self.drawn_ghost = set()
+        self.drawn_offset = 0
+        self.drawn_next_piece = None
+        self.drawn_score = None
+
+    def show_start_screen(self) -> bool:
+        """Display the welcome message, returning False if the window is closed"""
         self.screen.fill(BLACK)
-        font = pygame.font.Font(None, 36)
-        text1 = font.render("Welcome to Tetris Game", True, WHITE)
-        text2 = font.render("The game is created by Moses Jackson", True, WHITE)
+        text1 = render_text("Welcome to Tetris Game", 36, WHITE)
+        text2 = render_text("The game is created by Moses Jackson", 36, WHITE)
         
         text1_rect = text1.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 - 20))
         text2_rect = text2.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 20))
@@ -108,127 +146,142 @@ class Tetris:
         
         # Wait for a few seconds or key press
         waiting = True
-        start_time = pygame.time.get_ticks()
+        start_time = now_ms()
         while waiting:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    exit()
+                    return False
                 if event.type == pygame.KEYDOWN:
                     waiting = False
-            if pygame.time.get_ticks() - start_time > 3000:  # 3 seconds
+            if now_ms() - start_time > 3000:  # 3 seconds
                 waiting = False
-    def check_collision(self) -> bool:
-        """Check if the current piece collides with anything"""
-        piece_shape = SHAPES[self.current_piece['shape']][0]
-        for y, row in enumerate(piece_shape):
-            for x, cell in enumerate(row):
-                if cell == 'X':
-                    abs_x = self.current_piece['x'] + x
-                    abs_y = self.current_piece['y'] + y
-                    
-                    if (abs_x < 0 or abs_x >= GRID_WIDTH or 
-                        abs_y >= GRID_HEIGHT or 
-                        (abs_y >= 0 and self.grid[abs_y][abs_x] != BLACK)):
-                        return True
-        return False
+        return True
+
+    def cell_rect(self, x: int, y: int, offset: int = 0) -> pygame.Rect:
+        """Screen rectangle of a playfield cell, optionally nudged down"""
+        return pygame.Rect(x * BLOCK_SIZE, y * BLOCK_SIZE + offset, BLOCK_SIZE - 1, BLOCK_SIZE - 1)
+
+    def draw_stack(self) -> None:
+        """Redraw the cached surface of locked blocks"""
+        grid = self.engine.grid
+        self.blocks.draw(self.stack_surface,
+                         [(grid[y][x], x, y) for y in range(GRID_HEIGHT) for x in range(GRID_WIDTH)],
+                         BLOCK_SIZE)
+        self.stack_version = self.engine.board_version
+
+    def fall_offset(self, alpha: float) -> int:
+        """Pixels to slide the falling piece towards the next row when interpolating"""
+        engine = self.engine
+        piece = engine.current_piece
+        if (not self.interpolate or engine.game_over or
+                engine.collides(piece['shape'], piece['rotation'], piece['x'], piece['y'] + 1)):
+            return 0
+        progress = (engine.fall_timer + alpha * self.tick_ms) / engine.fall_speed
+        return min(BLOCK_SIZE - 1, int(progress * BLOCK_SIZE))
+
+    def draw_grid(self, alpha: float = 0.0) -> List[pygame.Rect]:
+        """Draw the game grid, ghost and current piece, returning the changed areas"""
+        dirty = []
+        if self.stack_version != self.engine.board_version:
+            self.draw_stack()
+            self.screen.blit(self.stack_surface, PLAYFIELD_RECT)
+            dirty.append(PLAYFIELD_RECT)
+            self.drawn_piece = set()
+            self.drawn_ghost = set()
+
+        current_piece = self.engine.current_piece
+        piece_cells = set()
+        ghost_cells = set()
+        if current_piece:
+            rotation = ROTATIONS[current_piece['shape']][current_piece['rotation']]
+            piece_cells = {(current_piece['x'] + x, current_piece['y'] + y)
+                           for x, y in rotation.cells}
+            if self.ghost and not self.engine.game_over:
+                drop = self.engine.landing_row() - current_piece['y']
+                ghost_cells = {(x, y + drop) for x, y in piece_cells} - piece_cells
+
+        # The piece and its ghost are repainted together, and only when
+        # either one moved; the stack underneath comes from the cached surface
+        offset = self.fall_offset(alpha)
+        if (piece_cells == self.drawn_piece and ghost_cells == self.drawn_ghost
+                and offset == self.drawn_offset):
+            return dirty
+
+        for cells, cell_offset in ((self.drawn_ghost, 0), (self.drawn_piece, self.drawn_offset)):
+            for x, y in cells:
+                rect = self.cell_rect(x, y, cell_offset)
+                self.screen.blit(self.stack_surface, rect, rect)
+                dirty.append(rect)
+        if current_piece:
+            color = SHAPES[current_piece['shape']][1]
+            for cells, sprite, cell_offset in ((ghost_cells, self.blocks.get(ghost_color(color)), 0),
+                                               (piece_cells, self.blocks.get(color), offset)):
+                for x, y in cells:
+                    rect = self.cell_rect(x, y, cell_offset)
+                    self.screen.blit(sprite, rect)
+                    dirty.append(rect)
+        self.drawn_piece = piece_cells
+        self.drawn_ghost = ghost_cells
+        self.drawn_offset = offset
+        return dirty
+
+    def draw_next_piece(self) -> List[pygame.Rect]:
+        """Draw the next piece preview if it changed"""
+        next_piece = self.engine.next_piece
+        if next_piece == self.drawn_next_piece:
+            return []
+        self.drawn_next_piece = next_piece
 
-    def rotate_piece(self) -> None:
-        """Rotate the current piece"""
-        original_rotation = self.current_piece['rotation']
-        self.current_piece['rotation'] = (self.current_piece['rotation'] + 1) % 4
-        
-        if self.check_collision():
-            self.current_piece['rotation'] = original_rotation
-
-    def clear_rows(self) -> None:
-        """Clear completed rows and update score"""
-        rows_cleared = 0
-        y = GRID_HEIGHT - 1
-        while y >= 0:
-            if all(color != BLACK for color in self.grid[y]):
-                rows_cleared += 1
-                # Move all rows above down
-                for move_y in range(y, 0, -1):
-                    self.grid[move_y] = self.grid[move_y - 1][:]
-                self.grid[0] = [BLACK] * GRID_WIDTH
-            else:
-                y -= 1
-
-        # Update score
-        if rows_cleared == 1:
-            self.score += 100
-        elif rows_cleared == 2:
-            self.score += 300
-        elif rows_cleared == 3:
-            self.score += 500
-        elif rows_cleared == 4:
-            self.score += 800
-
-        # Update level
-        if self.score >= self.level * 1000:
-            self.level += 1
-            self.fall_speed = max(100, 1000 - (self.level - 1) * 100)
-
-    def draw_grid(self) -> None:
-        """Draw the game grid and current piece"""
-        # Draw the fixed blocks
-        for y in range(GRID_HEIGHT):
-            for x in range(GRID_WIDTH):
-                pygame.draw.rect(self.screen, self.grid[y][x],
-                               (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE - 1, BLOCK_SIZE - 1))
-
-        # Draw the current piece
-        if self.current_piece:
-            piece_shape = SHAPES[self.current_piece['shape']][0]
-            piece_color = SHAPES[self.current_piece['shape']][1]
-            
-            for y, row in enumerate(piece_shape):
-                for x, cell in enumerate(row):
-                    if cell == 'X':
-                        pygame.draw.rect(self.screen, piece_color,
-                                       ((self.current_piece['x'] + x) * BLOCK_SIZE,
-                                        (self.current_piece['y'] + y) * BLOCK_SIZE,
-                                        BLOCK_SIZE - 1, BLOCK_SIZE - 1))
-
-    def draw_next_piece(self) -> None:
-        """Draw the next piece preview"""
         # Clear the preview area
-        preview_x = GRID_WIDTH * BLOCK_SIZE + 20
-        preview_y = 50
-        pygame.draw.rect(self.screen, BLACK, 
-                        (preview_x, preview_y, 5 * BLOCK_SIZE, 5 * BLOCK_SIZE))
+        pygame.draw.rect(self.screen, BLACK, PREVIEW_RECT)
 
         # Draw the next piece
-        if self.next_piece:
-            piece_shape = SHAPES[self.next_piece][0]
-            piece_color = SHAPES[self.next_piece][1]
-            
-            for y, row in enumerate(piece_shape):
-                for x, cell in enumerate(row):
-                    if cell == 'X':
-                        pygame.draw.rect(self.screen, piece_color,
-                                       (preview_x + x * BLOCK_SIZE,
-                                        preview_y + y * BLOCK_SIZE,
-                                        BLOCK_SIZE - 1, BLOCK_SIZE - 1))
-
-    def draw_score(self) -> None:
-        """Draw the score and level information"""
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f'Score: {self.score}', True, WHITE)
-        level_text = font.render(f'Level: {self.level}', True, WHITE)
-        
-        self.screen.blit(score_text, (GRID_WIDTH * BLOCK_SIZE + 20, 200))
-        self.screen.blit(level_text, (GRID_WIDTH * BLOCK_SIZE + 20, 240))
+        if next_piece:
+            piece_color = SHAPES[next_piece][1]
+            self.blocks.draw(self.screen,
+                             [(piece_color, x, y) for x, y in ROTATIONS[next_piece][0].cells],
+                             BLOCK_SIZE, PREVIEW_RECT.topleft)
+        return [PREVIEW_RECT]
+
+    def draw_score(self) -> List[pygame.Rect]:
+        """Draw the score and level information if they changed"""
+        score = (self.engine.score, self.engine.level)
+        if score == self.drawn_score:
+            return []
+        self.drawn_score = score
+
+        score_text = self.score_label.render(self.engine.score)
+        level_text = self.level_label.render(self.engine.level)
+
+        pygame.draw.rect(self.screen, BLACK, SCORE_RECT)
+        self.screen.blit(score_text, (SCORE_RECT.x, SCORE_RECT.y))
+        self.screen.blit(level_text, (SCORE_RECT.x, SCORE_RECT.y + 40))
+        return [SCORE_RECT]
+
+    def draw(self, alpha: float = 0.0) -> None:
+        """Push the parts of the frame that changed to the display
+
+        alpha is the fraction of a logic tick elapsed since the last update.
+        """
+        with self.profiler.phase('draw'):
+            if self.full_redraw:
+                self.screen.fill(BLACK)
+            dirty = self.draw_grid(alpha) + self.draw_next_piece() + self.draw_score()
+            dirty += self.profiler.draw_overlay(self.screen, PROFILER_POS)
+        with self.profiler.phase('flip'):
+            if self.full_redraw:
+                pygame.display.flip()
+                self.full_redraw = False
+            elif dirty:
+                pygame.display.update(dirty)
 
     def game_over_screen(self) -> bool:
         """Display game over screen and handle restart"""
         self.screen.fill(BLACK)
-        font = pygame.font.Font(None, 48)
-        game_over_text = font.render('GAME OVER', True, WHITE)
-        score_text = font.render(f'Final Score: {self.score}', True, WHITE)
-        restart_text = font.render('Press R to Restart', True, WHITE)
-        quit_text = font.render('Press Q to Quit', True, WHITE)
+        game_over_text = render_text('GAME OVER', 48, WHITE)
+        score_text = get_font(48).render(f'Final Score: {self.engine.score}', True, WHITE)
+        restart_text = render_text('Press R to Restart', 48, WHITE)
+        quit_text = render_text('Press Q to Quit', 48, WHITE)
 
         self.screen.blit(game_over_text, 
                         (SCREEN_WIDTH//2 - game_over_text.get_width()//2, SCREEN_HEIGHT//2 - 100))
@@ -251,79 +304,127 @@ class Tetris:
                     if event.key == pygame.K_q:
                         return False
         
+    def start_game(self, seed: Optional[int] = None) -> None:
+        """Reset the engine and, when recording, start a new input log"""
+        if self.record_dir is not None:
+            # A replay needs a concrete seed to reproduce the piece sequence
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            self.recording = Recording(seed, self.engine.generator.name, self.tick_ms)
+        self.engine.reset(seed)
+        self.input.reset()
+
+    def save_recording(self) -> None:
+        """Write the current game's input log to the recording directory"""
+        if self.recording is None:
+            return
+        self.recording.ticks = self.engine.ticks
+        os.makedirs(self.record_dir, exist_ok=True)
+        self.recording.save(os.path.join(self.record_dir, f'tetris-{self.recording.seed}.replay'))
+        self.recording = None
+
+    def toggle_autoplay(self) -> None:
+        """Switch the demo AI on or off"""
+        self.autoplayer = None if self.autoplayer else AutoPlayer()
+
+    def update_tick(self) -> None:
+        """Advance the game by one fixed logic tick"""
+        actions = self.input.update(self.tick_ms)
+        if self.autoplayer is not None:
+            actions.append(self.autoplayer(self.engine))
+        for action, run in groupby(actions):
+            count = len(list(run))
+            if self.recording is not None:
+                for _ in range(count):
+                    self.recording.add(self.engine.ticks, action)
+            if action in SHIFTS and count > 1 and not self.engine.game_over:
+                # Auto-repeat moves due in the same tick slide in one computation
+                self.engine.shift(SHIFTS[action], count)
+            else:
+                for _ in range(count):
+                    self.engine.step(action)
+        self.engine.tick(self.tick_ms)
+
+    def run_headless(self, max_ticks: Optional[int] = None) -> int:
+        """Run logic ticks back to back without rendering or waiting"""
+        ticks = 0
+        while not self.engine.game_over and (max_ticks is None or ticks < max_ticks):
+            self.update_tick()
+            ticks += 1
+        return ticks
+
+    def poll_input(self) -> bool:
+        """Feed pending keyboard events to the input handler, returning False on quit"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN and event.key in KEY_ACTIONS:
+                self.input.press(KEY_ACTIONS[event.key])
+            elif event.type == pygame.KEYUP and event.key in KEY_ACTIONS:
+                self.input.release(KEY_ACTIONS[event.key])
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_a:
+                self.toggle_autoplay()
+        return True
+
     def run(self) -> None:
         """Main game loop"""
-        self.show_start_screen()
-        
+        if not self.render:
+            self.run_headless()
+            self.save_recording()
+            return
+
+        if not self.show_start_screen():
+            return
+        frame_ms = 1000 / self.max_fps if self.max_fps else 0
+        accumulator = 0.0
+        previous_time = last_frame = now_ms()
+        self.profiler.begin_frame()
+
         while True:
-            if not self.current_piece:
-                self.new_piece()
-                if self.game_over:
-                    if self.game_over_screen():
-                        # Reset game
-                        self.__init__()
-                        continue
-                    else:
-                        break
-
-            current_time = pygame.time.get_ticks()
+            if self.engine.game_over:
+                self.save_recording()
+                if self.game_over_screen():
+                    # Reset game
+                    self.start_game()
+                    self.invalidate_display()
+                    accumulator = 0.0
+                    previous_time = now_ms()
+                    self.profiler.begin_frame()
+                    continue
+                else:
+                    break
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+            # Clamp long hitches so the simulation never spirals behind
+            current_time = now_ms()
+            accumulator += min(current_time - previous_time, MAX_FRAME_TIME)
+            previous_time = current_time
+
+            # Run as many fixed logic ticks as the elapsed time calls for,
+            # reading the keyboard just before each one
+            while accumulator >= self.tick_ms:
+                with self.profiler.phase('input'):
+                    running = self.poll_input()
+                if not running:
+                    self.save_recording()
                     return
-                
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_LEFT:
-                        self.current_piece['x'] -= 1
-                        if self.check_collision():
-                            self.current_piece['x'] += 1
-                    
-                    elif event.key == pygame.K_RIGHT:
-                        self.current_piece['x'] += 1
-                        if self.check_collision():
-                            self.current_piece['x'] -= 1
-                    
-                    elif event.key == pygame.K_UP:
-                        self.rotate_piece()
-                    
-                    elif event.key == pygame.K_DOWN:
-                        self.current_piece['y'] += 1
-                        if self.check_collision():
-                            self.current_piece['y'] -= 1
-                            self.freeze_piece()
-                            self.clear_rows()
-                            self.current_piece = None
-
-            # Handle automatic falling
-            if current_time - self.last_fall_time > self.fall_speed:
-                self.current_piece['y'] += 1
-                if self.check_collision():
-                    self.current_piece['y'] -= 1
-                    self.freeze_piece()
-                    self.clear_rows()
-                    self.current_piece = None
-                self.last_fall_time = current_time
-
-            # Draw everything
-            self.screen.fill(BLACK)
-            self.draw_grid()
-            self.draw_next_piece()
-            self.draw_score()
-            pygame.display.flip()
-            self.clock.tick(60)
-
-    def freeze_piece(self) -> None:
-        """Freeze the current piece in place"""
-        piece_shape = SHAPES[self.current_piece['shape']][0]
-        piece_color = SHAPES[self.current_piece['shape']][1]
-        
-        for y, row in enumerate(piece_shape):
-            for x, cell in enumerate(row):
-                if cell == 'X':
-                    self.grid[self.current_piece['y'] + y][self.current_piece['x'] + x] = piece_color
+                with self.profiler.phase('update'):
+                    self.update_tick()
+                accumulator -= self.tick_ms
+
+            # Draw whatever changed, at most max_fps times a second
+            if current_time - last_frame >= frame_ms:
+                self.draw(accumulator / self.tick_ms)
+                last_frame = current_time
+                self.profiler.end_frame()
+                self.profiler.begin_frame()
+
+            # Sleep until the next logic tick or frame is due, whichever is
+            # first, so input is sampled at the tick rate even at low frame rates
+            if frame_ms:
+                wait = min(self.tick_ms - accumulator, frame_ms - (current_time - last_frame))
+                pygame.time.wait(max(0, int(wait)))
 
 # Start the game
 if __name__ == "__main__":
-    game = Tetris()
-    game.run()
-    pygame.quit()  
+    play()
+    pygame.quit()
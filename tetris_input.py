@@ -0,0 +1,98 @@
+"""Held-key handling for Tetris: delayed auto shift and auto repeat.
+
+Pressing left or right moves the piece once. If the key is still held after
+the DAS delay, the piece keeps moving every ARR milliseconds. Holding down
+repeats soft drops at a fixed interval. InputHandler is advanced once per
+logic tick and returns the engine actions due in that tick, so held keys
+behave the same at any frame rate.
+
+Auto-repeat moves due in the same tick are coalesced: they come out as one
+run of moves, which Tetris applies with a single TetrisEngine.shift, and an
+ARR of 0 becomes one SLIDE action. Either way the engine resolves the move
+with one wall-slide computation rather than a collision check per column.
+"""
+from __future__ import annotations
+
+from tetris_engine import GRID_WIDTH, LEFT, RIGHT, DOWN, SLIDE_LEFT, SLIDE_RIGHT
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # see IMPORT_BUDGET in benchmarks.py
+    from typing import List
+
+DAS_MS = 167        # hold time before auto shift starts
+ARR_MS = 33         # time between auto-shift moves, 0 to go straight to the wall
+SOFT_DROP_MS = 50   # time between soft drops while down is held
+
+SLIDES = {LEFT: SLIDE_LEFT, RIGHT: SLIDE_RIGHT}
+
+
+def _repeats(start: float, end: float, delay: float, interval: float) -> int:
+    """Repeats at delay, delay + interval, ... falling in the window (start, end]"""
+    if end < delay:
+        return 0
+    if interval <= 0:
+        return 1
+    fired = int((end - delay) // interval) + 1
+    if start >= delay:
+        fired -= int((start - delay) // interval) + 1
+    return fired
+
+
+class InputHandler:
+    def __init__(self, das: float = DAS_MS, arr: float = ARR_MS,
+                 soft_drop: float = SOFT_DROP_MS):
+        self.das = das
+        self.arr = arr
+        self.soft_drop = soft_drop
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget held keys and queued presses"""
+        self.queued: List[int] = []  # actions pressed since the last tick
+        self.held: List[int] = []    # held directions, the newest one wins
+        self.shift_timer = 0.0       # milliseconds the active direction has been held
+        self.down_held = False
+        self.drop_timer = 0.0
+
+    def press(self, action: int) -> None:
+        """Key down: the action happens once on the next tick, and may then repeat"""
+        if action in SLIDES:
+            if action in self.held:
+                return
+            self.held.append(action)
+            self.shift_timer = 0.0
+        elif action == DOWN:
+            self.down_held = True
+            self.drop_timer = 0.0
+        self.queued.append(action)
+
+    def release(self, action: int) -> None:
+        """Key up: stop repeating; a still-held opposite direction recharges DAS"""
+        if action in self.held:
+            if self.held[-1] == action:
+                self.shift_timer = 0.0
+            self.held.remove(action)
+        elif action == DOWN:
+            self.down_held = False
+
+    def update(self, dt: float) -> List[int]:
+        """Advance held keys by one tick of dt milliseconds and return its actions"""
+        actions = self.queued
+        self.queued = []
+
+        if self.held:
+            direction = self.held[-1]
+            start = self.shift_timer
+            self.shift_timer += dt
+            moves = _repeats(start, self.shift_timer, self.das, self.arr)
+            if moves and (self.arr <= 0 or moves >= GRID_WIDTH - 1):
+                actions.append(SLIDES[direction])
+            else:
+                actions.extend([direction] * moves)
+
+        if self.down_held:
+            start = self.drop_timer
+            self.drop_timer += dt
+            actions.extend([DOWN] * _repeats(start, self.drop_timer, self.soft_drop,
+                                             self.soft_drop))
+        return actions
@@ -0,0 +1,93 @@
+"""Seeded piece generators for the Tetris engine.
+
+Every generator owns its own ``random.Random`` so a game is reproducible
+from its seed alone, and pre-generates pieces in blocks into a queue that
+also serves the N-piece lookahead preview.
+"""
+from __future__ import annotations
+
+import random
+from collections import deque
+from itertools import islice
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # see IMPORT_BUDGET in benchmarks.py
+    from typing import List, Optional, Sequence, Tuple, Union
+
+
+class PieceGenerator:
+    """Base class; subclasses fill the queue one block at a time"""
+    name = None
+
+    def __init__(self, pieces: Sequence[str], seed: Optional[int] = None):
+        self.pieces = tuple(pieces)
+        self.rng = random.Random()
+        self.queue = deque()
+        self.reseed(seed)
+
+    def reseed(self, seed: Optional[int] = None) -> None:
+        """Restart the sequence from a seed"""
+        self.rng.seed(seed)
+        self.queue.clear()
+
+    def get_state(self) -> Tuple:
+        """Capture the RNG and queue so the sequence can be resumed later"""
+        return self.rng.getstate(), tuple(self.queue)
+
+    def set_state(self, state: Tuple) -> None:
+        """Resume a sequence captured with get_state"""
+        rng_state, queue = state
+        self.rng.setstate(rng_state)
+        self.queue = deque(queue)
+
+    def generate_block(self) -> List[str]:
+        """Return the next block of pieces"""
+        raise NotImplementedError
+
+    def next(self) -> str:
+        """Take the next piece off the queue"""
+        if not self.queue:
+            self.queue.extend(self.generate_block())
+        return self.queue.popleft()
+
+    def preview(self, count: int) -> List[str]:
+        """Return the next count pieces without consuming them"""
+        while len(self.queue) < count:
+            self.queue.extend(self.generate_block())
+        return list(islice(self.queue, count))
+
+
+class UniformGenerator(PieceGenerator):
+    """Each piece is drawn independently with equal probability"""
+    name = 'uniform'
+    block_size = 64
+
+    def generate_block(self) -> List[str]:
+        return self.rng.choices(self.pieces, k=self.block_size)
+
+
+class BagGenerator(PieceGenerator):
+    """7-bag: every run of len(pieces) contains each piece exactly once"""
+    name = '7bag'
+    bags_per_block = 8
+
+    def generate_block(self) -> List[str]:
+        block = []
+        for _ in range(self.bags_per_block):
+            bag = list(self.pieces)
+            self.rng.shuffle(bag)
+            block.extend(bag)
+        return block
+
+
+GENERATORS = {generator.name: generator for generator in (UniformGenerator, BagGenerator)}
+
+
+def make_generator(kind: Union[str, PieceGenerator], pieces: Sequence[str],
+                   seed: Optional[int] = None) -> PieceGenerator:
+    """Build a generator from its name, or pass an existing one through"""
+    if isinstance(kind, PieceGenerator):
+        return kind
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown piece generator {kind!r}, expected one of {sorted(GENERATORS)}")
+    return GENERATORS[kind](pieces, seed)
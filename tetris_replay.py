@@ -0,0 +1,163 @@
+"""Input-log recording and headless playback for Tetris.
+
+A game is fully determined by its seed, piece generator, tick length and
+the (tick, action) pairs the player produced, so that is all a recording
+stores. The binary format is a fixed header followed by one varint tick
+delta and one action byte per input, typically two bytes per key press.
+ReplayPlayer re-simulates a recording on a TetrisEngine far faster than real
+time, and keeps periodic snapshots so it can seek to any tick.
+"""
+from __future__ import annotations
+
+import bisect
+import struct
+
+from tetris_engine import TetrisEngine
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:  # see IMPORT_BUDGET in benchmarks.py
+    from typing import Dict, List, Optional, Tuple
+
+MAGIC = b'TRPL'
+VERSION = 2  # 2: gravity keeps the time left over after each fall
+# version, seed, tick length in ms, total ticks, event count
+_HEADER = struct.Struct('<BqdII')
+
+SNAPSHOT_INTERVAL = 600  # ticks between seek snapshots
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    """Append an unsigned LEB128 integer"""
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Decode an unsigned LEB128 integer, returning (value, next position)"""
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recording:
+    def __init__(self, seed: int, generator: str = 'uniform', tick_ms: float = 1000 / 60):
+        self.seed = seed
+        self.generator = generator
+        self.tick_ms = tick_ms
+        self.ticks = 0
+        self.events: List[Tuple[int, int]] = []
+
+    def add(self, tick: int, action: int) -> None:
+        """Log an action applied at the start of a logic tick"""
+        self.events.append((tick, action))
+
+    def to_bytes(self) -> bytes:
+        """Encode the recording in the compact binary format"""
+        name = self.generator.encode('ascii')
+        out = bytearray(MAGIC)
+        out += _HEADER.pack(VERSION, self.seed, self.tick_ms, self.ticks, len(self.events))
+        out.append(len(name))
+        out += name
+        previous_tick = 0
+        for tick, action in self.events:
+            _write_varint(out, tick - previous_tick)
+            out.append(action)
+            previous_tick = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Recording':
+        """Decode a recording produced by to_bytes"""
+        if data[:4] != MAGIC:
+            raise ValueError("Not a Tetris replay")
+        version, seed, tick_ms, ticks, count = _HEADER.unpack_from(data, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        pos = 4 + _HEADER.size
+        name_length = data[pos]
+        generator = data[pos + 1:pos + 1 + name_length].decode('ascii')
+        pos += 1 + name_length
+
+        recording = cls(seed, generator, tick_ms)
+        recording.ticks = ticks
+        tick = 0
+        for _ in range(count):
+            delta, pos = _read_varint(data, pos)
+            tick += delta
+            recording.events.append((tick, data[pos]))
+            pos += 1
+        return recording
+
+    def save(self, path: str) -> None:
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+
+class ReplayPlayer:
+    def __init__(self, recording: Recording, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.recording = recording
+        self.snapshot_interval = snapshot_interval
+        self.engine = TetrisEngine(recording.seed, recording.generator)
+        self.event_ticks = [tick for tick, _ in recording.events]
+        self.next_event = 0
+        self.snapshots: Dict[int, dict] = {0: self.engine.snapshot()}
+
+    @property
+    def tick(self) -> int:
+        return self.engine.ticks
+
+    def step_tick(self) -> None:
+        """Replay the inputs of the current tick, then advance one tick"""
+        engine = self.engine
+        events = self.recording.events
+        tick = engine.ticks
+        while self.next_event < len(events) and events[self.next_event][0] == tick:
+            engine.step(events[self.next_event][1])
+            self.next_event += 1
+        engine.tick(self.recording.tick_ms)
+
+        if engine.ticks % self.snapshot_interval == 0 and engine.ticks not in self.snapshots:
+            self.snapshots[engine.ticks] = engine.snapshot()
+
+    def play(self, until: Optional[int] = None) -> TetrisEngine:
+        """Run headlessly up to a tick, or to the end of the recording"""
+        if until is None:
+            until = self.recording.ticks
+        engine = self.engine
+        while engine.ticks < until and not engine.game_over:
+            self.step_tick()
+        return engine
+
+    def seek(self, tick: int) -> TetrisEngine:
+        """Jump to a tick, resuming from the nearest earlier snapshot"""
+        start = max(t for t in self.snapshots if t <= tick)
+        if not start <= self.engine.ticks <= tick:
+            self.engine.restore(self.snapshots[start])
+            self.next_event = bisect.bisect_left(self.event_ticks, start)
+        return self.play(tick)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    for path in sys.argv[1:]:
+        recording = Recording.load(path)
+        start = time.perf_counter()
+        engine = ReplayPlayer(recording).play()
+        elapsed = time.perf_counter() - start
+        speedup = recording.ticks * recording.tick_ms / 1000 / elapsed if elapsed else float('inf')
+        print(f"{path}: score {engine.score}, lines {engine.lines}, "
+              f"{recording.ticks} ticks replayed at {speedup:.0f}x real time")
@@ -0,0 +1,204 @@
+"""Run many headless Tetris games across a process pool.
+
+Every game is identified by its index in the sweep and gets a seed derived
+from the sweep seed and that index, so results do not depend on how games
+are spread over workers. Finished games stream back as they complete and are
+appended to a JSON-lines file, which is also how an interrupted sweep is
+resumed: games already in the file are skipped. Each record carries the
+sweep's settings, and a file written with other settings is not resumed.
+
+    python tetris_runner.py --games 100000 --policy random --out results.jsonl
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from multiprocessing import Pool
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from tetris_engine import TetrisEngine, ACTIONS
+from tetris_pieces import GENERATORS
+from tetris_ai import AutoPlayer
+
+TICK_MS = 1000 / 60        # logic tick length, matching the pygame front end
+MAX_PIECES = 10000         # cap so strong policies cannot run forever
+RESULT_FIELDS = ('score', 'level', 'lines', 'pieces')
+SWEEP_FIELDS = ('policy', 'generator', 'max_pieces')  # settings a resumed sweep must share
+
+
+Policy = Callable[[TetrisEngine], int]
+
+
+def random_policy(rng: random.Random) -> Policy:
+    """Press a random key every tick"""
+    return lambda engine: rng.choice(ACTIONS)
+
+
+def heuristic_policy(rng: random.Random) -> Policy:
+    """Play with the heuristic AI"""
+    return AutoPlayer()
+
+
+# Policy factories are looked up by name so that workers never have to
+# unpickle code; each game gets a fresh policy seeded from the game seed
+POLICIES: Dict[str, Callable[[random.Random], Policy]] = {
+    'random': random_policy,
+    'heuristic': heuristic_policy,
+}
+
+
+def game_seed(sweep_seed: int, index: int) -> int:
+    """Seed of one game in a sweep, independent of worker assignment"""
+    return (sweep_seed << 32) | index
+
+
+def play_game(index: int, sweep_seed: int = 0, policy: str = 'random',
+              generator: str = 'uniform', max_pieces: int = MAX_PIECES) -> dict:
+    """Play one game to the end and return its result record"""
+    seed = game_seed(sweep_seed, index)
+    engine = TetrisEngine(seed, generator)
+    choose = POLICIES[policy](random.Random(seed))
+
+    start = time.perf_counter()
+    while not engine.game_over and engine.pieces < max_pieces:
+        engine.step(choose(engine))
+        engine.tick(TICK_MS)
+
+    result = {'game': index, 'seed': seed, 'policy': policy, 'generator': generator,
+              'max_pieces': max_pieces, 'time': time.perf_counter() - start}
+    for field in RESULT_FIELDS:
+        result[field] = getattr(engine, field)
+    return result
+
+
+def _play_game_args(args: tuple) -> dict:
+    return play_game(*args)
+
+
+def load_results(path: Optional[str]) -> List[dict]:
+    """Results already recorded in a results file
+
+    Every record is written with its newline, so a last line without one was
+    cut short by an interrupted run. It is skipped, and trimmed off before new
+    results are appended, so that game is played again.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    with open(path) as file:
+        lines = file.readlines()
+    if lines and not lines[-1].endswith('\n'):
+        lines.pop()
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def check_resumable(results: Iterable[dict], sweep_seed: int, policy: str,
+                    generator: str, max_pieces: int) -> None:
+    """Raise ValueError unless every recorded game belongs to this sweep"""
+    settings = {'policy': policy, 'generator': generator, 'max_pieces': max_pieces}
+    for result in results:
+        if result['seed'] != game_seed(sweep_seed, result['game']):
+            raise ValueError(f"game {result['game']} was played with another sweep seed")
+        for field in SWEEP_FIELDS:
+            if result.get(field) != settings[field]:
+                raise ValueError(f"game {result['game']} was played with {field} "
+                                 f"{result.get(field)!r}, not {settings[field]!r}")
+
+
+def trim_partial_line(path: str) -> None:
+    """Cut off an unfinished last line, so appended results start on a line of their own"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as file:
+        data = file.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            file.truncate(end)
+
+
+def run_games(games: int, workers: Optional[int] = None, sweep_seed: int = 0,
+              policy: str = 'random', generator: str = 'uniform',
+              max_pieces: int = MAX_PIECES, out: Optional[str] = None,
+              chunksize: int = 16) -> Iterator[dict]:
+    """Yield game results as workers finish them, appending each to out
+
+    Raises ValueError if out holds games from a sweep with other settings.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}, expected one of {sorted(POLICIES)}")
+    previous = load_results(out)
+    check_resumable(previous, sweep_seed, policy, generator, max_pieces)
+    done = {result['game'] for result in previous}
+    tasks = [(index, sweep_seed, policy, generator, max_pieces)
+             for index in range(games) if index not in done]
+    if not tasks:
+        return
+    # Small sweeps still need to spread over every worker
+    pool_size = workers or os.cpu_count() or 1
+    chunksize = max(1, min(chunksize, len(tasks) // (4 * pool_size)))
+
+    if out:
+        trim_partial_line(out)
+    results_file = open(out, 'a') if out else None
+    try:
+        with Pool(workers) as pool:
+            for result in pool.imap_unordered(_play_game_args, tasks, chunksize):
+                if results_file:
+                    results_file.write(json.dumps(result) + '\n')
+                    results_file.flush()
+                yield result
+    finally:
+        if results_file:
+            results_file.close()
+
+
+def summarize(results: Iterable[dict]) -> Dict[str, dict]:
+    """Count, mean, standard deviation, min, median and max of each field"""
+    results = list(results)
+    summary = {}
+    for field in RESULT_FIELDS + ('time',):
+        values: List[float] = [result[field] for result in results]
+        if not values:
+            continue
+        summary[field] = {
+            'count': len(values),
+            'mean': statistics.fmean(values),
+            'stdev': statistics.pstdev(values),
+            'min': min(values),
+            'median': statistics.median(values),
+            'max': max(values),
+        }
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evaluate a Tetris policy over many headless games")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None, help="defaults to the CPU count")
+    parser.add_argument('--seed', type=int, default=0, help="sweep seed")
+    parser.add_argument('--policy', default='random', choices=sorted(POLICIES))
+    parser.add_argument('--generator', default='uniform', choices=sorted(GENERATORS))
+    parser.add_argument('--max-pieces', type=int, default=MAX_PIECES)
+    parser.add_argument('--out', help="JSON-lines results file; reruns resume from it")
+    args = parser.parse_args()
+
+    previous = load_results(args.out)
+    start = time.perf_counter()
+    try:
+        new = list(run_games(args.games, args.workers, args.seed, args.policy,
+                             args.generator, args.max_pieces, args.out))
+    except ValueError as error:
+        parser.error(f"cannot resume {args.out}: {error}")
+    elapsed = time.perf_counter() - start
+
+    rate = len(new) / elapsed if elapsed else 0
+    print(f"Played {len(new)} games in {elapsed:.1f}s ({rate:.0f} games/s)")
+    if previous:
+        print(f"Resumed {len(previous)} earlier games from {args.out}")
+    for field, stats in summarize(previous + new).items():
+        print(f"{field:>7}: " + ", ".join(f"{name} {value:.4g}" for name, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
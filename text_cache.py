@@ -0,0 +1,83 @@
+"""Shared font and rendered-text cache for the pygame games.
+
+Loading a font and rendering a string are both expensive, and the games
+redraw the same HUD strings every frame. Fonts are loaded once per
+(name, size) and rendered surfaces are kept in a bounded LRU cache keyed by
+(font, size, text, color).
+"""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+_fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+
+def get_font(size: int, name: Optional[str] = None) -> pygame.font.Font:
+    """Return a shared font, loading it on first use"""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(name, size)
+    return font
+
+
+class TextCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, text: str, size: int, color: Color,
+               name: Optional[str] = None) -> pygame.Surface:
+        """Return the rendered text, reusing a cached surface when possible"""
+        key = (name, size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = get_font(size, name).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        """Drop every cached surface"""
+        self.surfaces.clear()
+
+
+# Cache shared by all the games
+text_cache = TextCache()
+
+
+def render_text(text: str, size: int, color: Color,
+                name: Optional[str] = None) -> pygame.Surface:
+    """Render text through the shared cache"""
+    return text_cache.render(text, size, color, name)
+
+
+class TextLabel:
+    """A HUD label such as 'Score: {}' that re-renders only when its value changes
+
+    Labels bypass the shared cache so that a steadily increasing score does
+    not evict the static strings.
+    """
+
+    def __init__(self, template: str, size: int, color: Color, name: Optional[str] = None):
+        self.template = template
+        self.size = size
+        self.color = color
+        self.name = name
+        self.value = None
+        self.surface = None
+
+    def render(self, value) -> pygame.Surface:
+        """Return the label for a value, rendering only if the value changed"""
+        if self.surface is None or value != self.value:
+            self.value = value
+            self.surface = get_font(self.size, self.name).render(
+                self.template.format(value), True, self.color)
+        return self.surface